@@ -2,119 +2,242 @@
 
 from __future__ import annotations
 
-from asyncio import timeout
-from datetime import timedelta
+import asyncio
+from collections.abc import Callable, Collection, Iterable
+from datetime import UTC, datetime, timedelta
+from functools import partial
 import logging
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_EMAIL, CONF_SCAN_INTERVAL, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.entity import EntityDescription
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
+from homeassistant.const import (
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
+    Platform,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
 )
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .api import SmartCocoonAPI, SmartCocoonAuthError
+from .api import SmartCocoonAPI
+from .api.const import CLIENT_SYSTEMS_TTL, DEFAULT_MQTT_PORT
+from .api.data import Data as SmartCocoonData
 from .api.fan import Fan as SmartCocoonFan
+from .api.limiter import RateLimiter
+from .api.push import Push as SmartCocoonPush, aiomqtt
 from .api.room import Room as SmartCocoonRoom
 from .api.system import System as SmartCocoonSystem
 from .const import (
+    ATTR_STALE_SINCE,
     CONF_AUTHORIZATION,
+    CONF_AUTO_INCLUDE_FANS,
     CONF_FANS,
+    CONF_MQTT_HOST,
+    CONF_MQTT_PORT,
     CONF_SAVE_RESPONSES,
     CONF_SYSTEMS,
     CONF_TIMEOUT,
     CONFIGURATION_URL,
-    DATA_COORDINATOR,
+    DATA_API,
+    DATA_COORDINATORS,
+    DATA_KNOWN_FANS,
+    DATA_KNOWN_ROOMS,
+    DATA_LIMITER,
+    DATA_OPTIONS,
+    DATA_PHASES,
+    DATA_PUSH,
+    DATA_SNAPSHOT,
+    DATA_STORES,
+    DEFAULT_AUTO_INCLUDE_FANS,
     DEFAULT_SAVE_LOCATION,
     DEFAULT_SAVE_RESPONSES,
     DEVICE_MANUFACTURER,
     DOMAIN,
+    FAN_REMOVAL_POLLS,
+    POLL_STAGGER_SLOTS,
+    POLL_STAGGER_STEP,
+    SIGNAL_ADD_COORDINATOR,
+    SIGNAL_REMOVE_FANS,
     UNDO_UPDATE_LISTENER,
     ScanInterval,
     Timeout,
 )
+from .coordinator import (
+    SmartCocoonCoordinator,
+    SmartCocoonSnapshot,
+    async_get_snapshot_store,
+)
+from .services import async_setup_services
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 PLATFORMS = (
     Platform.BINARY_SENSOR,
     Platform.FAN,
     Platform.NUMBER,
     Platform.SELECT,
+    Platform.SENSOR,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
-    """Set up a config entry."""
+def conf_options(config_entry: ConfigEntry) -> dict[str, Any]:
+    """Return the effective options of a config entry."""
     data = config_entry.data
     options = config_entry.options
+    return {
+        key: options.get(key, data.get(key, default))
+        for key, default in (
+            (CONF_AUTO_INCLUDE_FANS, DEFAULT_AUTO_INCLUDE_FANS),
+            (CONF_FANS, []),
+            (CONF_MQTT_HOST, None),
+            (CONF_MQTT_PORT, DEFAULT_MQTT_PORT),
+            (CONF_SAVE_RESPONSES, DEFAULT_SAVE_RESPONSES),
+            (CONF_SCAN_INTERVAL, ScanInterval.DEFAULT),
+            (CONF_SYSTEMS, []),
+            (CONF_TIMEOUT, Timeout.DEFAULT),
+        )
+    }
 
-    conf_systems = options.get(CONF_SYSTEMS, data.get(CONF_SYSTEMS, []))
-    conf_fans = options.get(CONF_FANS, data.get(CONF_FANS, []))
-    conf_identifiers = [(DOMAIN, conf_id) for conf_id in conf_systems + conf_fans]
 
-    device_registry = dr.async_get(hass)
-    device_entries = dr.async_entries_for_config_entry(
-        registry=device_registry,
-        config_entry_id=config_entry.entry_id,
+def entry_device_info(config_entry: ConfigEntry) -> dr.DeviceInfo:
+    """Return the info of the service device of a config entry."""
+    return dr.DeviceInfo(
+        configuration_url=CONFIGURATION_URL,
+        entry_type=dr.DeviceEntryType.SERVICE,
+        identifiers={(DOMAIN, config_entry.entry_id)},
+        manufacturer=DEVICE_MANUFACTURER,
+        name=f"SmartCocoon ({config_entry.title})",
     )
-    for device_entry in device_entries:
-        orphan_identifiers = [
-            bool(device_identifier not in conf_identifiers)
-            for device_identifier in device_entry.identifiers
-        ]
-        if all(orphan_identifiers):
-            device_registry.async_remove_device(device_entry.id)
 
-    api = SmartCocoonAPI(
-        authorization=data[CONF_AUTHORIZATION],
-        save_location=DEFAULT_SAVE_LOCATION
-        if options.get(CONF_SAVE_RESPONSES, DEFAULT_SAVE_RESPONSES)
-        else None,
-    )
 
-    async def async_update_data():
-        """Fetch data from API endpoint.
+def group_unique_id(
+    config_entry: ConfigEntry, system_id: int, room_id: int | None = None
+) -> str:
+    """Return the unique ID of the fan group of a system or room."""
+    unique_id = f"{config_entry.entry_id}-system-{system_id}"
+    if room_id is not None:
+        return f"{unique_id}-room-{room_id}"
+    return unique_id
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
-        """
-        try:
-            async with timeout(
-                options.get(CONF_TIMEOUT, data.get(CONF_TIMEOUT, Timeout.DEFAULT))
-            ):
-                return await api.update(target_systems=conf_systems)
-        except SmartCocoonAuthError as exception:
-            raise ConfigEntryAuthFailed from exception
-        except Exception as exception:
-            raise UpdateFailed(
-                f"{type(exception).__name__} while communicating with API: {exception}"
-            ) from exception
-
-    coordinator = DataUpdateCoordinator(
-        hass=hass,
-        logger=_LOGGER,
-        name=f"SmartCocoon ({data[CONF_EMAIL]})",
-        update_method=async_update_data,
-        update_interval=timedelta(
-            seconds=options.get(CONF_SCAN_INTERVAL, ScanInterval.DEFAULT)
-        ),
-    )
-    await coordinator.async_refresh()
+
+def conf_push(conf: dict[str, Any]) -> bool:
+    """Return True if push updates are configured and available."""
+    return bool(conf[CONF_MQTT_HOST]) and aiomqtt is not None
+
+
+def conf_scan_interval(conf: dict[str, Any]) -> float:
+    """Return the idle polling interval for the options."""
+    if conf_push(conf):
+        # Push updates keep state current, polling is only a safety net
+        return max(conf[CONF_SCAN_INTERVAL], ScanInterval.MAX)
+    return conf[CONF_SCAN_INTERVAL]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the SmartCocoon integration."""
+    async_setup_services(hass)
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
+    """Set up a config entry."""
+    data = config_entry.data
+    conf = conf_options(config_entry)
+
+    if not conf[CONF_AUTO_INCLUDE_FANS]:
+        # Otherwise devices are removed as fans disappear from the account
+        async_remove_orphan_devices(
+            hass, config_entry, [*conf[CONF_SYSTEMS], *conf[CONF_FANS]]
+        )
+
+    @callback
+    def async_update_authorization(authorization: str | None) -> None:
+        """Persist a refreshed authorization to the config entry."""
+        hass.config_entries.async_update_entry(
+            config_entry,
+            data={**config_entry.data, CONF_AUTHORIZATION: authorization},
+        )
 
     hass.data.setdefault(DOMAIN, {})
+    # Shared by all entries, so the account-wide request rate stays bounded
+    limiter = hass.data[DOMAIN].setdefault(DATA_LIMITER, RateLimiter())
+
+    api = SmartCocoonAPI(
+        session=async_get_clientsession(hass),
+        limiter=limiter,
+        client_systems_ttl=CLIENT_SYSTEMS_TTL,
+        authorization=data[CONF_AUTHORIZATION],
+        email=data[CONF_EMAIL],
+        password=data.get(CONF_PASSWORD),
+        authorization_callback=async_update_authorization,
+        save_location=DEFAULT_SAVE_LOCATION if conf[CONF_SAVE_RESPONSES] else None,
+    )
+    snapshot = SmartCocoonSnapshot(hass=hass, config_entry=config_entry, api=api)
+
+    push = None
+    if conf[CONF_MQTT_HOST] and not conf_push(conf):
+        _LOGGER.warning("Push updates require aiomqtt, polling instead")
+    if conf_push(conf):
+
+        @callback
+        def async_handle_push(fan_id: int, payload: dict) -> None:
+            """Patch the coordinator data with a pushed fan state."""
+            _LOGGER.debug("Push update for fan: %s", fan_id)
+            # Identity fields key the data, devices and entities
+            payload = {
+                key: value
+                for key, value in payload.items()
+                if key not in SmartCocoonFan.IDENTITY_FIELDS
+            }
+            for coordinator in snapshot.coordinators.values():
+                if coordinator.data and fan_id in coordinator.data.fans:
+                    coordinator.async_patch_fan(fan_id, payload)
+
+        push = SmartCocoonPush(
+            host=conf[CONF_MQTT_HOST],
+            port=int(conf[CONF_MQTT_PORT]),
+            callback=async_handle_push,
+            codec=api.codec,
+            task_factory=partial(config_entry.async_create_background_task, hass),
+        )
+
     hass.data[DOMAIN][config_entry.entry_id] = {
-        CONF_SYSTEMS: conf_systems,
-        CONF_FANS: conf_fans,
-        DATA_COORDINATOR: coordinator,
+        CONF_SYSTEMS: conf[CONF_SYSTEMS],
+        CONF_FANS: conf[CONF_FANS],
+        CONF_AUTO_INCLUDE_FANS: conf[CONF_AUTO_INCLUDE_FANS],
+        DATA_API: api,
+        DATA_COORDINATORS: snapshot.coordinators,
+        DATA_KNOWN_FANS: {},
+        DATA_KNOWN_ROOMS: {},
+        DATA_OPTIONS: conf,
+        DATA_PUSH: push,
+        DATA_SNAPSHOT: snapshot,
         UNDO_UPDATE_LISTENER: config_entry.add_update_listener(async_update_listener),
     }
 
+    last_data = await snapshot.async_load()
+    await asyncio.gather(
+        *(
+            async_add_coordinator(hass, config_entry, system_id, last_data)
+            for system_id in conf[CONF_SYSTEMS]
+        )
+    )
+
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
     return True
@@ -128,22 +251,369 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     )
     if unload_ok:
         hass.data[DOMAIN][config_entry.entry_id][UNDO_UPDATE_LISTENER]()
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry = hass.data[DOMAIN].pop(config_entry.entry_id)
+        # Do not leave a delayed save behind, it would outlive a removal
+        await entry[DATA_SNAPSHOT].async_flush()
+        if entry[DATA_PUSH]:
+            await entry[DATA_PUSH].stop()
+        await entry[DATA_API].close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove a config entry."""
+    await async_get_snapshot_store(hass, config_entry).async_remove()
+    hass.data[DOMAIN][DATA_STORES].pop(config_entry.entry_id)
+
+
 async def async_update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply changed options to the running config entry."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    previous = entry[DATA_OPTIONS]
+    conf = conf_options(config_entry)
+    if conf == previous:
+        # Only data changed, e.g. a refreshed authorization
+        return
+    if any(conf[key] != previous[key] for key in (CONF_MQTT_HOST, CONF_MQTT_PORT)):
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        return
+    entry[DATA_OPTIONS] = conf
+    api: SmartCocoonAPI = entry[DATA_API]
+    coordinators: dict[int, SmartCocoonCoordinator] = entry[DATA_COORDINATORS]
+
+    if conf[CONF_SAVE_RESPONSES] != previous[CONF_SAVE_RESPONSES]:
+        await api.set_save_location(
+            DEFAULT_SAVE_LOCATION if conf[CONF_SAVE_RESPONSES] else None
+        )
+
+    if any(conf[key] != previous[key] for key in (CONF_SCAN_INTERVAL, CONF_TIMEOUT)):
+        for coordinator in coordinators.values():
+            coordinator.async_set_options(
+                scan_interval=conf_scan_interval(conf), timeout=conf[CONF_TIMEOUT]
+            )
+
+    if all(
+        conf[key] == previous[key]
+        for key in (CONF_AUTO_INCLUDE_FANS, CONF_FANS, CONF_SYSTEMS)
+    ):
+        return
+    entry[CONF_SYSTEMS] = conf[CONF_SYSTEMS]
+    entry[CONF_FANS] = conf[CONF_FANS]
+    entry[CONF_AUTO_INCLUDE_FANS] = conf[CONF_AUTO_INCLUDE_FANS]
+    for system_id in coordinators.keys() - set(conf[CONF_SYSTEMS]):
+        await async_remove_coordinator(hass, config_entry, system_id)
+    if not conf[CONF_AUTO_INCLUDE_FANS]:
+        async_remove_orphan_devices(
+            hass, config_entry, [*conf[CONF_SYSTEMS], *conf[CONF_FANS]]
+        )
+    target_fans = None if conf[CONF_AUTO_INCLUDE_FANS] else frozenset(conf[CONF_FANS])
+    retargeted = [
+        coordinator
+        for coordinator in coordinators.values()
+        if coordinator.target_fans != target_fans
+    ]
+    # Retarget all first, a refresh may update sibling systems too
+    for coordinator in retargeted:
+        coordinator.target_fans = target_fans
+        coordinator.missing_fans = {}
+    for coordinator in retargeted:
+        await coordinator.async_refresh()
+    await asyncio.gather(
+        *(
+            async_add_coordinator(hass, config_entry, system_id)
+            for system_id in conf[CONF_SYSTEMS]
+            if system_id not in coordinators
+        )
+    )
+
+
+async def async_add_coordinator(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    system_id: int,
+    last_data: SmartCocoonData | None = None,
+) -> SmartCocoonCoordinator:
+    """Add and refresh the coordinator of a system."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    conf = entry[DATA_OPTIONS]
+    snapshot: SmartCocoonSnapshot = entry[DATA_SNAPSHOT]
+    slot = hass.data[DOMAIN].get(DATA_PHASES, 0)
+    hass.data[DOMAIN][DATA_PHASES] = slot + 1
+    phase = slot % POLL_STAGGER_SLOTS * POLL_STAGGER_STEP
+    coordinator = SmartCocoonCoordinator(
+        hass=hass,
+        config_entry=config_entry,
+        api=entry[DATA_API],
+        snapshot=snapshot,
+        name=f"SmartCocoon ({config_entry.data[CONF_EMAIL]}) {system_id}",
+        system_id=system_id,
+        scan_interval=conf_scan_interval(conf),
+        timeout=conf[CONF_TIMEOUT],
+        target_fans=None
+        if conf[CONF_AUTO_INCLUDE_FANS]
+        else frozenset(conf[CONF_FANS]),
+        phase=phase,
+    )
+    delayed = False
+    if last_data and (system := last_data.systems.get(system_id)):
+        # Create entities from the last good data and refresh in the background
+        coordinator.async_set_updated_data(SmartCocoonData([system]))
+        if phase:
+            # The first poll is scheduled after the phase once the listener
+            # below is added
+            delayed = True
+            coordinator.phase = 0
+            coordinator.update_interval = timedelta(seconds=max(phase, 1))
+        else:
+            config_entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN}_refresh_{system_id}"
+            )
+    else:
+        await coordinator.async_refresh()
+    entry[DATA_COORDINATORS][system_id] = coordinator
+    config_entry.async_on_unload(
+        coordinator.async_add_listener(
+            partial(async_handle_coordinator_update, hass, config_entry, coordinator)
+        )
+    )
+    if delayed:
+        coordinator.update_interval = timedelta(seconds=coordinator.interval)
+    async_handle_coordinator_update(hass, config_entry, coordinator)
+    async_dispatcher_send(
+        hass, SIGNAL_ADD_COORDINATOR.format(entry_id=config_entry.entry_id), coordinator
+    )
+    return coordinator
+
+
+async def async_remove_coordinator(
+    hass: HomeAssistant, config_entry: ConfigEntry, system_id: int
+) -> None:
+    """Remove the coordinator of a system, its fan groups and fan devices."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator: SmartCocoonCoordinator = entry[DATA_COORDINATORS].pop(system_id)
+    await coordinator.async_shutdown()
+    async_remove_group_entities(hass, config_entry, system_id)
+    entry[DATA_KNOWN_ROOMS].pop(system_id, None)
+    async_remove_fan_devices(
+        hass, config_entry, entry[DATA_KNOWN_FANS].pop(system_id, set())
+    )
+    async_update_push(hass, config_entry)
+    entry[DATA_SNAPSHOT].async_save()
+
+
+@callback
+def async_handle_coordinator_update(
+    hass: HomeAssistant, config_entry: ConfigEntry, coordinator: SmartCocoonCoordinator
+) -> None:
+    """Remove devices of fans and groups of rooms gone from a system."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    if entry[DATA_COORDINATORS].get(coordinator.system_id) is not coordinator:
+        return
+    known = entry[DATA_KNOWN_FANS].setdefault(coordinator.system_id, set())
+    if coordinator.data:
+        known.update(coordinator.data.fans)
+    if entry[CONF_AUTO_INCLUDE_FANS] and (
+        gone := {
+            fan_id
+            for fan_id, polls in coordinator.missing_fans.items()
+            if polls >= FAN_REMOVAL_POLLS
+        }
+    ):
+        async_remove_fan_devices(hass, config_entry, gone & known)
+        known.difference_update(gone)
+        for fan_id in gone:
+            del coordinator.missing_fans[fan_id]
+    if (
+        coordinator.data
+        and (
+            coordinator.data.fans
+            # Empty because every fan of the system is deselected, rather
+            # than an empty response
+            or (
+                coordinator.target_fans is not None
+                and known.isdisjoint(coordinator.target_fans)
+            )
+        )
+        and not (entry[CONF_AUTO_INCLUDE_FANS] and coordinator.missing_fans)
+    ):
+        rooms = {fan.room.id for fan in coordinator.data.fans.values()}
+        if entry[DATA_KNOWN_ROOMS].get(coordinator.system_id) != rooms:
+            entry[DATA_KNOWN_ROOMS][coordinator.system_id] = rooms
+            # Without any rooms left the system group is removed too
+            async_remove_group_entities(
+                hass, config_entry, coordinator.system_id, keep_rooms=rooms or None
+            )
+    async_update_push(hass, config_entry)
+
+
+@callback
+def async_remove_group_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    system_id: int,
+    keep_rooms: Collection[int] | None = None,
+) -> None:
+    """Remove the group entities of a system, or only of rooms not kept."""
+    unique_id = group_unique_id(config_entry, system_id)
+    room_prefix = f"{unique_id}-room-"
+    entity_registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(
+        entity_registry, config_entry.entry_id
+    ):
+        if entity_entry.unique_id.startswith(room_prefix):
+            room_id = entity_entry.unique_id.removeprefix(room_prefix)
+            if (
+                keep_rooms is not None
+                and room_id.isdigit()
+                and int(room_id) in keep_rooms
+            ):
+                continue
+        elif keep_rooms is not None or entity_entry.unique_id != unique_id:
+            continue
+        _LOGGER.debug("Removing entity: %s", entity_entry.entity_id)
+        entity_registry.async_remove(entity_entry.entity_id)
+
+
+@callback
+def async_update_push(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Keep push subscriptions in sync with the coordinator data."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    if (push := entry[DATA_PUSH]) is None:
+        return
+    push.update_fans(
+        fan
+        for coordinator in entry[DATA_COORDINATORS].values()
+        if coordinator.data
+        for fan_id, fan in coordinator.data.fans.items()
+        if entry[CONF_AUTO_INCLUDE_FANS] or fan_id in entry[CONF_FANS]
+    )
+
+
+@callback
+def async_remove_fan_devices(
+    hass: HomeAssistant, config_entry: ConfigEntry, fan_ids: Iterable[int]
+) -> None:
+    """Remove the devices of fans, and with them their entities."""
+    device_registry = dr.async_get(hass)
+    removed: set[int] = set()
+    for fan_id in fan_ids:
+        if device_entry := device_registry.async_get_device(
+            identifiers={(DOMAIN, str(fan_id))}
+        ):
+            _LOGGER.debug("Removing device: %s", device_entry.name)
+            device_registry.async_remove_device(device_entry.id)
+            removed.add(fan_id)
+    async_signal_removed_fans(hass, config_entry, removed)
 
 
-class SmartCocoonEntity(CoordinatorEntity):
+@callback
+def async_remove_orphan_devices(
+    hass: HomeAssistant, config_entry: ConfigEntry, conf_ids: Iterable[int | str]
+) -> None:
+    """Remove devices of a config entry matching none of the given IDs."""
+    conf_identifiers = {
+        (DOMAIN, str(conf_id)) for conf_id in [*conf_ids, config_entry.entry_id]
+    }
+    device_registry = dr.async_get(hass)
+    removed: set[int] = set()
+    for device_entry in dr.async_entries_for_config_entry(
+        registry=device_registry,
+        config_entry_id=config_entry.entry_id,
+    ):
+        if device_entry.identifiers.isdisjoint(conf_identifiers):
+            _LOGGER.debug("Removing device: %s", device_entry.name)
+            device_registry.async_remove_device(device_entry.id)
+            removed.update(
+                int(identifier)
+                for domain, identifier in device_entry.identifiers
+                if domain == DOMAIN and identifier.isdigit()
+            )
+    async_signal_removed_fans(hass, config_entry, removed)
+
+
+@callback
+def async_signal_removed_fans(
+    hass: HomeAssistant, config_entry: ConfigEntry, fan_ids: set[int]
+) -> None:
+    """Signal platforms that fans lost their entities, so they can be added again."""
+    if fan_ids:
+        async_dispatcher_send(
+            hass, SIGNAL_REMOVE_FANS.format(entry_id=config_entry.entry_id), fan_ids
+        )
+
+
+@callback
+def async_add_fan_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    create_entities: Callable[
+        [SmartCocoonCoordinator, SmartCocoonFan], Iterable[SmartCocoonEntity]
+    ],
+) -> None:
+    """Add entities for the enabled fans, now and as they appear later."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    # Keyed by coordinator, so a system added again starts afresh
+    added: dict[SmartCocoonCoordinator, set[int]] = {}
+
+    @callback
+    def async_add_new_fans() -> None:
+        """Add entities for fans without entities."""
+        entities: list[SmartCocoonEntity] = []
+        coordinators = entry[DATA_COORDINATORS].values()
+        for stale in added.keys() - set(coordinators):
+            del added[stale]
+        for coordinator in coordinators:
+            if not coordinator.data:
+                continue
+            system_added = added.setdefault(coordinator, set())
+            for fan_id, fan in coordinator.data.fans.items():
+                if fan_id in system_added or not (
+                    entry[CONF_AUTO_INCLUDE_FANS] or fan_id in entry[CONF_FANS]
+                ):
+                    continue
+                system_added.add(fan_id)
+                entities.extend(create_entities(coordinator, fan))
+        if entities:
+            async_add_entities(entities)
+
+    @callback
+    def async_remove_fans(fan_ids: set[int]) -> None:
+        """Forget fans whose entities were removed with their devices."""
+        for system_added in added.values():
+            system_added.difference_update(fan_ids)
+
+    @callback
+    def async_add_coordinator_listener(coordinator: SmartCocoonCoordinator) -> None:
+        """Add entities of a coordinator, now and on its updates."""
+        config_entry.async_on_unload(coordinator.async_add_listener(async_add_new_fans))
+        async_add_new_fans()
+
+    for coordinator in entry[DATA_COORDINATORS].values():
+        async_add_coordinator_listener(coordinator)
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADD_COORDINATOR.format(entry_id=config_entry.entry_id),
+            async_add_coordinator_listener,
+        )
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_REMOVE_FANS.format(entry_id=config_entry.entry_id),
+            async_remove_fans,
+        )
+    )
+
+
+class SmartCocoonEntity(CoordinatorEntity[SmartCocoonCoordinator]):
     """Representation of a SmartCocoon entity."""
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: SmartCocoonCoordinator,
         system_id: int,
         room_id: int,
         fan_id: int,
@@ -156,25 +626,64 @@ class SmartCocoonEntity(CoordinatorEntity):
         self.fan_id = fan_id
         if entity_description:
             self.entity_description = entity_description
+        self._available: bool | None = None
+        self._stale: bool | None = None
+        self._data: SmartCocoonData | None = None
+        self._fan: SmartCocoonFan | None = None
+
+    @property
+    def coordinator_data(self) -> SmartCocoonData | None:
+        """Return a SmartCocoonData object."""
+        return self.coordinator.data
 
     @property
     def system(self) -> SmartCocoonSystem | None:
         """Return a SmartCocoonSystem object."""
-        data: list[SmartCocoonSystem] = self.coordinator.data  # pyright: ignore[reportAssignmentType]
-        systems = {system.id: system for system in data}
-        return systems.get(self.system_id)
+        return (
+            self.coordinator_data.systems.get(self.system_id)
+            if self.coordinator_data
+            else None
+        )
 
     @property
     def room(self) -> SmartCocoonRoom | None:
         """Return a SmartCocoonRoom object."""
-        rooms = {room.id: room for room in self.system.rooms} if self.system else {}
-        return rooms.get(self.room_id)
+        return (
+            self.coordinator_data.rooms.get(self.room_id)
+            if self.coordinator_data
+            else None
+        )
 
     @property
     def fan(self) -> SmartCocoonFan | None:
-        """Return a SmartCocoonFan object."""
-        fans = {fan.id: fan for fan in self.room.fans} if self.room else {}
-        return fans.get(self.fan_id)
+        """Return a SmartCocoonFan object, cached until the next update."""
+        if self.coordinator_data is not self._data:
+            self._data = self.coordinator_data
+            self._fan = self._data.fans.get(self.fan_id) if self._data else None
+        return self._fan
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the fan, its availability or staleness changed."""
+        available = self.available
+        stale = self.coordinator.stale_since is not None
+        if (
+            available is self._available
+            and stale is self._stale
+            and self.coordinator_data is not None
+            and self.fan_id not in self.coordinator_data.changed
+        ):
+            return
+        self._available = available
+        self._stale = stale
+        super()._handle_coordinator_update()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the time since which the state is stale, if it is."""
+        if (stale_since := self.coordinator.stale_since) is None:
+            return None
+        return {ATTR_STALE_SINCE: datetime.fromtimestamp(stale_since, UTC).isoformat()}
 
     @property
     def available(self) -> bool:
@@ -2,16 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Collection
+import hashlib
 from http import HTTPMethod
-import json
 import logging
-from pathlib import Path
+import time
 from typing import Any, Literal
 
-import aiofiles
 import aiohttp
 
-from .const import API_PREFIX
+from .capture import Capture
+from .codec import DEFAULT_CODEC, Codec
+from .const import (
+    API_PREFIX,
+    DEFAULT_CONCURRENCY_LIMIT,
+    DEFAULT_CONNECTION_LIMIT,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    RETRY_ATTEMPTS,
+    WRITE_WINDOW,
+)
+from .data import Data
+from .limiter import RateLimiter
+from .retry import CircuitBreaker, backoff, is_transient, retry_after
+from .stats import Stats
 from .system import System
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,96 +41,510 @@ class SmartCocoonAPI:
 
     def __init__(
         self,
+        session: aiohttp.ClientSession | None = None,
         authorization: str | None = None,
         save_location: str | None = None,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        concurrency_limit: int = DEFAULT_CONCURRENCY_LIMIT,
+        write_window: float = WRITE_WINDOW,
+        api_prefix: str = API_PREFIX,
+        email: str | None = None,
+        password: str | None = None,
+        authorization_callback: Callable[[str | None], None] | None = None,
+        codec: Codec = DEFAULT_CODEC,
+        bulk_rooms: bool | None = None,
+        client_systems_ttl: float = 0,
+        limiter: RateLimiter | None = None,
     ) -> None:
         """Initialize."""
+        self._email = email
+        self._password = password
+        self._session = session
+        self._owns_session = session is None
+        self.api_prefix = api_prefix
         self.authorization = authorization
+        self.authorization_callback = authorization_callback
+        self.breaker = CircuitBreaker()
+        self.breakers: dict[int, CircuitBreaker] = {}
+        self.bulk_rooms = bulk_rooms
+        self.client_systems_lock = asyncio.Lock()
+        self.client_systems_result: tuple[float, dict[str, Any] | None] | None = None
+        self.client_systems_ttl = client_systems_ttl
+        self.cache: dict[str, tuple[str | None, str | None, bytes, Any]] = {}
+        self.cache_hits = 0
+        self.concurrency_limit = concurrency_limit
+        self.connection_limit = connection_limit
+        self.limiter = limiter
+        self.login_lock = asyncio.Lock()
+        self.models: dict[
+            int,
+            tuple[dict[str, Any], list[Any], frozenset[int] | None, System],
+        ] = {}
+        self.partition: tuple[Any, tuple[int, ...], dict[int, list[Any]]] | None = None
+        self.pending_writes: dict[
+            int, tuple[dict[str, Any], asyncio.Future[dict[str, Any] | None]]
+        ] = {}
+        self.capture = Capture(save_location, codec=codec) if save_location else None
+        self.codec = codec
+        self.retries = 0
         self.save_location = save_location
+        self.stats = Stats()
+        self.system_timings: dict[int, float] = {}
         self.user_id = None
+        self.write_window = write_window
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the client session, creating a pooled one if required."""
+        if self._session is None or self._session.closed:
+            _LOGGER.debug(
+                "Creating client session with connection limit: %s",
+                self.connection_limit,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                    limit=self.connection_limit,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                )
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the client session if it is owned by this instance."""
+        if self.capture is not None:
+            await self.capture.stop()
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def set_save_location(self, save_location: str | None) -> None:
+        """Start, stop or move capturing responses."""
+        if save_location == self.save_location:
+            return
+        if self.capture is not None:
+            await self.capture.stop()
+        self.capture = (
+            Capture(save_location, codec=self.codec) if save_location else None
+        )
+        self.save_location = save_location
+        # Models keep their raw data only while capturing
+        self.models.clear()
 
     async def login(self, email: str, password: str) -> dict[str, Any]:
         """Login."""
         path = "auth/sign_in"
         data = {"email": email, "password": password}
-        async with aiohttp.request(
-            method=HTTPMethod.POST, url=f"{API_PREFIX}/{path}", data=data
+        async with self.session.request(
+            method=HTTPMethod.POST, url=f"{self.api_prefix}/{path}", data=data
         ) as response:
             if response.status == 403:
                 raise SmartCocoonAuthError
             response.raise_for_status()
-            result = await self.save_result(result=await response.json(), name=path)
+            result = self.save_result(
+                result=self.codec.loads(await response.read()), name=path
+            )
             self.authorization = response.headers.get("authorization")
             self.user_id = result["data"]["id"]
             return result
 
+    async def relogin(self, authorization: str | None) -> None:
+        """Login again with the stored credentials."""
+        async with self.login_lock:
+            if self.authorization != authorization:
+                # Another caller logged in while waiting for the lock
+                return
+            _LOGGER.debug("Authorization rejected, logging in again")
+            await self.login(email=self._email, password=self._password)
+        if self.authorization_callback:
+            self.authorization_callback(self.authorization)
+
     async def call(
         self,
         method: Literal[HTTPMethod.GET, HTTPMethod.POST, HTTPMethod.PUT],
         path: str,
         params: dict | None = None,
+        deadline: float | None = None,
+        breaker: CircuitBreaker | None = None,
         **kwargs,
     ) -> dict[str, Any] | None:
-        """Call."""
-        async with aiohttp.request(
-            method=method,
-            url=f"{API_PREFIX}/{path}",
-            headers={"authorization": self.authorization} if self.authorization else {},
-            params=params,
-            **kwargs,
-        ) as response:
-            if response.status == 403:
-                raise SmartCocoonAuthError
-            response.raise_for_status()
-            if response.status == 204:
-                return None
-            return await self.save_result(result=await response.json(), name=path)
-
-    async def save_result(
-        self, result: dict[str, Any], name: str = "result"
-    ) -> dict[str, Any]:
-        """Save the result to a file."""
-        if self.save_location and result:
-            if not Path(self.save_location).is_dir():
-                _LOGGER.debug("Creating directory: %s", self.save_location)
-                Path(self.save_location).mkdir()
-            name = name.replace("/", "_").replace(".", "_")
-            file_path_name = f"{self.save_location}/{name}.json"
-            _LOGGER.debug("Saving result: %s", file_path_name)
-            async with aiofiles.open(file_path_name, mode="w") as file:
-                await file.write(
-                    json.dumps(
-                        result,
-                        default=lambda o: "not-serializable",
-                        indent=4,
-                        sort_keys=True,
-                    )
+        """Call, retrying transient GET failures with backoff."""
+        if breaker is None:
+            breaker = self.breaker
+        breaker.check()
+        attempt = 0
+        while True:
+            try:
+                result = await self.authorized_request(method, path, params, **kwargs)
+            except Exception as exception:
+                if not is_transient(exception):
+                    raise
+                delay = retry_after(exception)
+                if delay is None:
+                    delay = backoff(attempt)
+                elif self.limiter is not None:
+                    self.limiter.throttle(delay)
+                attempt += 1
+                if (
+                    method != HTTPMethod.GET
+                    or attempt >= RETRY_ATTEMPTS
+                    or (deadline is not None and time.monotonic() + delay >= deadline)
+                ):
+                    breaker.record_failure()
+                    raise
+                _LOGGER.debug(
+                    "%s while calling %s, retrying in %.2f seconds",
+                    type(exception).__name__,
+                    path,
+                    delay,
                 )
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    async def authorized_request(
+        self,
+        method: Literal[HTTPMethod.GET, HTTPMethod.POST, HTTPMethod.PUT],
+        path: str,
+        params: dict | None = None,
+        **kwargs,
+    ) -> dict[str, Any] | None:
+        """Request, logging in again once if the authorization is rejected."""
+        authorization = self.authorization
+        try:
+            return await self.request(method, path, params, **kwargs)
+        except SmartCocoonAuthError:
+            if not (self._email and self._password):
+                raise
+        await self.relogin(authorization)
+        return await self.request(method, path, params, **kwargs)
+
+    async def request(
+        self,
+        method: Literal[HTTPMethod.GET, HTTPMethod.POST, HTTPMethod.PUT],
+        path: str,
+        params: dict | None = None,
+        **kwargs,
+    ) -> dict[str, Any] | None:
+        """Request, sending conditional headers for GETs with cached validators."""
+        endpoint = self.stats.endpoint(method, path)
+        name = "_".join([path, *map(str, (params or {}).values())])
+        cached = self.cache.get(name) if method == HTTPMethod.GET else None
+        headers = {"authorization": self.authorization} if self.authorization else {}
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        if (payload := kwargs.pop("json", None)) is not None:
+            headers["Content-Type"] = "application/json"
+            kwargs["data"] = self.codec.dumps(payload)
+        if self.limiter is not None:
+            await self.limiter.acquire(priority=method != HTTPMethod.GET)
+        start = time.monotonic()
+        size = 0
+        try:
+            async with self.session.request(
+                method=method,
+                url=f"{self.api_prefix}/{path}",
+                headers=headers,
+                params=params,
+                **kwargs,
+            ) as response:
+                if response.status == 403:
+                    raise SmartCocoonAuthError
+                response.raise_for_status()
+                result = None
+                if response.status == 304 and cached is not None:
+                    self.cache_hits += 1
+                    result = cached[3]
+                elif response.status != 204:
+                    body = await response.read()
+                    size = len(body)
+                    digest = hashlib.blake2b(body, digest_size=16).digest()
+                    if cached is not None and cached[2] == digest:
+                        self.cache_hits += 1
+                        result = cached[3]
+                    else:
+                        result = self.save_result(
+                            result=self.codec.loads(body), name=name
+                        )
+                    if method == HTTPMethod.GET:
+                        self.cache[name] = (
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                            digest,
+                            result,
+                        )
+        except BaseException as exception:
+            self.stats.record(
+                endpoint=endpoint,
+                latency=time.monotonic() - start,
+                size=size,
+                error=self.stats.error(exception),
+            )
+            raise
+        self.stats.record(
+            endpoint=endpoint, latency=time.monotonic() - start, size=size
+        )
+        return result
+
+    def system_breaker(self, system_id: int) -> CircuitBreaker:
+        """Return the circuit breaker of a system."""
+        if (breaker := self.breakers.get(system_id)) is None:
+            breaker = self.breakers[system_id] = CircuitBreaker()
+        return breaker
+
+    async def write(
+        self, fan_id: int, data: dict[str, Any], system_id: int | None = None
+    ) -> dict[str, Any] | None:
+        """Write fan properties, coalescing writes within the write window."""
+        if (pending := self.pending_writes.get(fan_id)) is not None:
+            body, future = pending
+            body.update(data)
+            return await asyncio.shield(future)
+        body = dict(data)
+        future = asyncio.get_running_loop().create_future()
+        self.pending_writes[fan_id] = (body, future)
+        try:
+            await asyncio.sleep(self.write_window)
+            del self.pending_writes[fan_id]
+            _LOGGER.debug("Writing fan: %s with data: %s", fan_id, body)
+            result = await self.call(
+                method=HTTPMethod.PUT,
+                path=f"fans/{fan_id}",
+                breaker=None if system_id is None else self.system_breaker(system_id),
+                json=body,
+            )
+        except asyncio.CancelledError:
+            self.pending_writes.pop(fan_id, None)
+            future.cancel()
+            raise
+        except Exception as exception:
+            future.set_exception(exception)
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+    def save_result(self, result: Any, name: str = "result") -> Any:
+        """Queue the result for capture if saving is enabled."""
+        if self.capture is not None and result:
+            self.capture.put(name=name, result=result)
         return result
 
-    async def update(self, target_systems: list[int] | None = None) -> list[System]:
-        """Update."""
+    def parse(self, systems: list[dict[str, Any]]) -> Data:
+        """Parse a list of system dicts, including rooms and fans."""
+        return Data([System(self, system) for system in systems])
+
+    async def client_systems(
+        self, deadline: float | None = None
+    ) -> dict[str, Any] | None:
+        """Return client systems, shared between callers for a short time."""
+        async with self.client_systems_lock:
+            if (
+                self.client_systems_result is not None
+                and time.monotonic() - self.client_systems_result[0]
+                < self.client_systems_ttl
+            ):
+                return self.client_systems_result[1]
+            systems = await self.call(
+                method=HTTPMethod.GET,
+                path="client_systems",
+                deadline=deadline,
+            )
+            self.client_systems_result = (time.monotonic(), systems)
+            return systems
+
+    async def update(
+        self,
+        target_systems: Collection[int] | None = None,
+        deadline: float | None = None,
+        target_fans: Collection[int] | None = None,
+        sibling_systems: Collection[int] = (),
+        cache_models: bool = True,
+    ) -> Data:
+        """Update the target systems, or all systems."""
+        if target_fans is not None:
+            target_fans = frozenset(target_fans)
+        systems = await self.client_systems(deadline)
+        if not systems:
+            return Data([])
+        # Models of other targets are kept, they are polled separately
+        for system_id in self.models.keys() - {
+            system["id"] for system in systems["client_systems"]
+        }:
+            if cache_models:
+                del self.models[system_id]
+        targets = [
+            system
+            for system in systems["client_systems"]
+            if target_systems is None or system["id"] in target_systems
+        ]
+        target_ids = {system["id"] for system in targets}
+        bulk_targets = [
+            system
+            for system in systems["client_systems"]
+            if system["id"] in target_ids or system["id"] in sibling_systems
+        ]
+        if (
+            self.bulk_rooms is not False
+            and len(bulk_targets) > 1
+            and (
+                data := await self.update_bulk(
+                    bulk_targets, deadline, target_fans, cache_models
+                )
+            )
+            is not None
+        ):
+            return data
+        semaphore = asyncio.Semaphore(self.concurrency_limit)
+        results = await asyncio.gather(
+            *(
+                self.update_system(
+                    system, semaphore, deadline, target_fans, cache_models
+                )
+                for system in targets
+            ),
+            return_exceptions=True,
+        )
         data = []
-        systems = await self.call(
-            method=HTTPMethod.GET,
-            path="client_systems",
+        errors: list[BaseException] = []
+        for system, result in zip(targets, results, strict=True):
+            if isinstance(result, SmartCocoonAuthError):
+                raise result
+            if isinstance(result, BaseException):
+                _LOGGER.warning(
+                    "%s while updating system: %s (%s)",
+                    type(result).__name__,
+                    system["id"],
+                    result,
+                )
+                errors.append(result)
+            elif result:
+                data.append(result)
+        if errors and not data:
+            raise errors[0]
+        return Data(data)
+
+    async def update_system(
+        self,
+        system: dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        deadline: float | None = None,
+        target_fans: frozenset[int] | None = None,
+        cache_models: bool = True,
+    ) -> System | None:
+        """Update a single system."""
+        start = time.monotonic()
+        try:
+            async with semaphore:
+                rooms = await self.call(
+                    method=HTTPMethod.GET,
+                    path="rooms",
+                    params={
+                        "filter%5Bthermostat%5D%5Bclient_system_id": system["id"],
+                    },
+                    deadline=deadline,
+                    breaker=self.system_breaker(system["id"]),
+                )
+        finally:
+            self.system_timings[system["id"]] = time.monotonic() - start
+            _LOGGER.debug(
+                "Updated system: %s in %.3f seconds",
+                system["id"],
+                self.system_timings[system["id"]],
+            )
+        if not rooms:
+            return None
+        return self.build_system(system, rooms["rooms"], target_fans, cache_models)
+
+    async def update_bulk(
+        self,
+        targets: list[dict[str, Any]],
+        deadline: float | None = None,
+        target_fans: frozenset[int] | None = None,
+        cache_models: bool = True,
+    ) -> Data | None:
+        """Update all target systems with a single unfiltered rooms request."""
+        start = time.monotonic()
+        try:
+            rooms = await self.call(
+                method=HTTPMethod.GET,
+                path="rooms",
+                deadline=deadline,
+            )
+        except aiohttp.ClientResponseError as exception:
+            if self.bulk_rooms or is_transient(exception):
+                raise
+            rooms = None
+        if (partition := self.partition_rooms(rooms, targets, cache_models)) is None:
+            _LOGGER.debug("Bulk rooms request not supported, requesting per system")
+            self.bulk_rooms = False
+            return None
+        self.bulk_rooms = True
+        elapsed = time.monotonic() - start
+        for system in targets:
+            self.system_timings[system["id"]] = elapsed
+        _LOGGER.debug(
+            "Updated systems: %s in %.3f seconds",
+            [system["id"] for system in targets],
+            elapsed,
         )
-        if systems:
-            for system in systems["client_systems"]:
-                if any(
-                    [
-                        target_systems is None,
-                        target_systems and system["id"] in target_systems,
-                    ]
-                ):
-                    rooms = await self.call(
-                        method=HTTPMethod.GET,
-                        path="rooms",
-                        params={
-                            "filter%5Bthermostat%5D%5Bclient_system_id": system["id"],
-                        },
-                    )
-                    if rooms:
-                        system["rooms"] = rooms["rooms"]
-                        data.append(System(self, system))
-        return data
+        return Data(
+            [
+                self.build_system(
+                    system, partition[system["id"]], target_fans, cache_models
+                )
+                for system in targets
+            ]
+        )
+
+    def partition_rooms(
+        self,
+        rooms: dict[str, Any] | None,
+        targets: list[dict[str, Any]],
+        cache: bool = True,
+    ) -> dict[int, list[Any]] | None:
+        """Partition an unfiltered rooms result by client system ID."""
+        system_ids = tuple(system["id"] for system in targets)
+        if (
+            cache
+            and self.partition is not None
+            and self.partition[0] is rooms
+            and self.partition[1] == system_ids
+        ):
+            return self.partition[2]
+        if not isinstance(rooms, dict) or not isinstance(rooms.get("rooms"), list):
+            return None
+        partition: dict[int, list[Any]] = {system_id: [] for system_id in system_ids}
+        for room in rooms["rooms"]:
+            if not isinstance(room, dict) or "client_system_id" not in room:
+                return None
+            if (system_rooms := partition.get(room["client_system_id"])) is not None:
+                system_rooms.append(room)
+        if cache:
+            self.partition = (rooms, system_ids, partition)
+        return partition
+
+    def build_system(
+        self,
+        system: dict[str, Any],
+        rooms: list[Any],
+        target_fans: frozenset[int] | None = None,
+        cache: bool = True,
+    ) -> System:
+        """Build a system model, reusing the previous one if its data is unchanged."""
+        if not cache:
+            return System(self, {**system, "rooms": rooms}, target_fans)
+        if (cached := self.models.get(system["id"])) is not None and (
+            cached[0] is system and cached[1] is rooms and cached[2] == target_fans
+        ):
+            return cached[3]
+        model = System(self, {**system, "rooms": rooms}, target_fans)
+        self.models[system["id"]] = (system, rooms, target_fans, model)
+        return model
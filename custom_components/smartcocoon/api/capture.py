@@ -0,0 +1,95 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+import gzip
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from .codec import DEFAULT_CODEC, Codec
+from .const import CAPTURE_MAX_BYTES, CAPTURE_MAX_FILES, CAPTURE_QUEUE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Capture:
+    """Capture responses to rotating files from a background worker."""
+
+    def __init__(
+        self,
+        location: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        max_files: int = CAPTURE_MAX_FILES,
+        queue_size: int = CAPTURE_QUEUE_SIZE,
+        codec: Codec = DEFAULT_CODEC,
+    ) -> None:
+        """Initialize."""
+        self.codec = codec
+        self.location = Path(location)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.dropped = 0
+        self.queue: asyncio.Queue[tuple[float, str, Any]] = asyncio.Queue(queue_size)
+        self.task: asyncio.Task | None = None
+
+    def put(self, name: str, result: Any) -> None:
+        """Queue a result for capture, dropping it if the queue is full."""
+        if self.task is None:
+            self.task = asyncio.create_task(self.worker(), name="smartcocoon_capture")
+        try:
+            self.queue.put_nowait((time.time(), name, result))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            _LOGGER.debug("Capture queue full, dropped result: %s", name)
+
+    async def worker(self) -> None:
+        """Write queued results in the executor."""
+        loop = asyncio.get_running_loop()
+        while True:
+            timestamp, name, result = await self.queue.get()
+            try:
+                await loop.run_in_executor(None, self.write, timestamp, name, result)
+            except (OSError, TypeError, ValueError) as exception:
+                _LOGGER.warning(
+                    "%s while capturing result: %s (%s)",
+                    type(exception).__name__,
+                    name,
+                    exception,
+                )
+
+    def write(self, timestamp: float, name: str, result: Any) -> None:
+        """Write a result to a compressed, timestamped file and rotate."""
+        if not self.location.is_dir():
+            _LOGGER.debug("Creating directory: %s", self.location)
+            self.location.mkdir(parents=True, exist_ok=True)
+        name = name.replace("/", "_").replace(".", "_")
+        stamp = datetime.fromtimestamp(timestamp, UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        file_path = self.location / f"{name}_{stamp}.json.gz"
+        _LOGGER.debug("Saving result: %s", file_path)
+        with gzip.open(file_path, mode="wb") as file:
+            file.write(self.codec.dumps(result))
+        self.rotate()
+
+    def rotate(self) -> None:
+        """Remove the oldest files beyond the count or size cap."""
+        files = sorted(
+            ((file, file.stat()) for file in self.location.glob("*.json.gz")),
+            key=lambda item: item[1].st_mtime,
+            reverse=True,
+        )
+        total = 0
+        for index, (file, stat) in enumerate(files):
+            total += stat.st_size
+            if index >= self.max_files or total > self.max_bytes:
+                file.unlink(missing_ok=True)
+
+    async def stop(self) -> None:
+        """Stop the worker, discarding any queued results."""
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
@@ -0,0 +1,53 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def not_serializable(obj: Any) -> str:
+    """Replace an object that cannot be serialized."""
+    return "not-serializable"
+
+
+class JsonCodec:
+    """JSON codec using the standard library."""
+
+    name = "json"
+
+    @staticmethod
+    def loads(data: bytes | str) -> Any:
+        """Decode JSON."""
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        """Encode compact JSON."""
+        return json.dumps(obj, default=not_serializable, separators=(",", ":")).encode()
+
+
+class OrjsonCodec:
+    """JSON codec using orjson."""
+
+    name = "orjson"
+
+    @staticmethod
+    def loads(data: bytes | str) -> Any:
+        """Decode JSON."""
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        """Encode compact JSON."""
+        return orjson.dumps(obj, default=not_serializable)
+
+
+Codec = JsonCodec | OrjsonCodec
+
+DEFAULT_CODEC: Codec = OrjsonCodec() if orjson is not None else JsonCodec()
@@ -21,6 +21,43 @@ class DeviceSize(StrEnum):
 
 API_PREFIX = "https://app.mysmartcocoon.com/api"
 
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+CAPTURE_MAX_FILES = 100
+CAPTURE_QUEUE_SIZE = 32
+
+CLIENT_SYSTEMS_TTL = 300
+
+DEFAULT_CONCURRENCY_LIMIT = 4
+
+DEFAULT_CONNECTION_LIMIT = 10
+
+DNS_CACHE_TTL = 300
+
+KEEPALIVE_TIMEOUT = 60
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+WRITE_WINDOW = 0.25
+
+CIRCUIT_BREAKER_RESET_TIMEOUT = 300
+CIRCUIT_BREAKER_THRESHOLD = 5
+
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_COMMAND_BURST = 50
+RATE_LIMIT_COMMAND_RATE = 2.0
+RATE_LIMIT_RATE = 1.0
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 10
+
+DEFAULT_MQTT_PORT = 1883
+
+MQTT_RECONNECT_INTERVAL_MAX = 300
+MQTT_RECONNECT_INTERVAL_MIN = 5
+
+MQTT_STATE_TOPIC = "{mqtt_username}/{fan_id}/state"
+
 DEFAULT_MODEL_NAME = "Smart Vent / Register Booster Fan"
 
 DEVICE_SIZE_MAP = {
@@ -0,0 +1,69 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+from .fan import Fan
+from .room import Room
+from .system import System
+
+
+class Data:
+    """Data indexed by system, room and fan ID."""
+
+    def __init__(self, systems: list[System]) -> None:
+        """Initialize."""
+        self.systems: dict[int, System] = {}
+        self.rooms: dict[int, Room] = {}
+        self.fans: dict[int, Fan] = {}
+        for system in systems:
+            self.systems[system.id] = system
+            for room in system.rooms:
+                self.rooms[room.id] = room
+                for fan in room.fans:
+                    self.fans[fan.id] = fan
+        self.states: dict[int, tuple[Any, ...]] = {
+            fan_id: fan.state for fan_id, fan in self.fans.items()
+        }
+        self.changed: set[int] = set(self.fans)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the systems and all fan states are equal."""
+        if not isinstance(other, Data):
+            return NotImplemented
+        return (
+            self.systems.keys() == other.systems.keys() and self.states == other.states
+        )
+
+    def __iter__(self) -> Iterator[System]:
+        """Iterate over systems."""
+        return iter(self.systems.values())
+
+    def __len__(self) -> int:
+        """Return the number of systems."""
+        return len(self.systems)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return a list of system dict representations."""
+        return [system.as_dict() for system in self.systems.values()]
+
+    def diff(self, previous: Data | None) -> set[int]:
+        """Set and return the IDs of fans changed since a previous update."""
+        if previous is not None:
+            self.changed = {
+                fan_id
+                for fan_id, state in self.states.items()
+                if previous.states.get(fan_id) != state
+            }
+            self.changed.update(previous.states.keys() - self.states.keys())
+        return self.changed
+
+    def patch_fan(self, fan_id: int, data: dict[str, Any]) -> bool:
+        """Patch a fan, returning True if anything changed."""
+        if (fan := self.fans.get(fan_id)) is None or not fan.patch(data):
+            return False
+        self.states[fan_id] = fan.state
+        self.changed = {fan_id}
+        return True
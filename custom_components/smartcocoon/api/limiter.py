@@ -0,0 +1,125 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import time
+from typing import Any
+
+from .const import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_COMMAND_BURST,
+    RATE_LIMIT_COMMAND_RATE,
+    RATE_LIMIT_RATE,
+)
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate, shared by all API instances."""
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RATE,
+        burst: int = RATE_LIMIT_BURST,
+        command_rate: float = RATE_LIMIT_COMMAND_RATE,
+        command_burst: int = RATE_LIMIT_COMMAND_BURST,
+    ) -> None:
+        """Initialize."""
+        self.burst = burst
+        self.command_burst = command_burst
+        self.command_rate = command_rate
+        self.command_tokens = float(command_burst)
+        self.handle: asyncio.TimerHandle | None = None
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiters: dict[bool, deque[asyncio.Future[None]]] = {
+            True: deque(),
+            False: deque(),
+        }
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        if now > self.updated:
+            self.tokens = min(
+                self.tokens + (now - self.updated) * self.rate, self.burst
+            )
+            self.command_tokens = min(
+                self.command_tokens + (now - self.updated) * self.command_rate,
+                self.command_burst,
+            )
+            self.updated = now
+
+    def throttle(self, delay: float) -> None:
+        """Empty the bucket and pause refilling, e.g. as requested by the API."""
+        self.refill()
+        self.tokens = min(self.tokens, 0.0)
+        self.command_tokens = min(self.command_tokens, 0.0)
+        self.updated = max(self.updated, time.monotonic() + delay)
+
+    async def acquire(self, priority: bool = False) -> None:
+        """Take a token, waiting for one if required."""
+        self.refill()
+        if priority and self.command_tokens >= 1:
+            self.command_tokens -= 1
+            return
+        if self.tokens >= 1 and not self.waiters[True] and not self.waiters[False]:
+            self.tokens -= 1
+            return
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[priority].append(future)
+        self.schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in self.waiters[priority]:
+                self.waiters[priority].remove(future)
+            elif not future.cancelled():
+                # Granted but not used
+                self.tokens += 1
+            raise
+        finally:
+            self.waits += 1
+            self.wait_time += time.monotonic() - start
+
+    def schedule(self) -> None:
+        """Schedule granting tokens to waiters once the bucket has refilled."""
+        if self.handle is not None:
+            return
+        delay = max(self.updated - time.monotonic(), 0.0) + max(
+            (1 - self.tokens) / self.rate, 0.0
+        )
+        self.handle = asyncio.get_running_loop().call_later(delay, self.release)
+
+    def release(self) -> None:
+        """Grant tokens to waiters, priority waiters first."""
+        self.handle = None
+        self.refill()
+        for waiters in (self.waiters[True], self.waiters[False]):
+            while waiters and self.tokens >= 1:
+                future = waiters.popleft()
+                if not future.done():
+                    self.tokens -= 1
+                    future.set_result(None)
+        if self.waiters[True] or self.waiters[False]:
+            self.schedule()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        self.refill()
+        return {
+            "burst": self.burst,
+            "command_burst": self.command_burst,
+            "command_rate": self.command_rate,
+            "command_tokens": round(self.command_tokens, 2),
+            "rate": self.rate,
+            "tokens": round(self.tokens, 2),
+            "waiting": len(self.waiters[True]) + len(self.waiters[False]),
+            "wait_time": round(self.wait_time, 3),
+            "waits": self.waits,
+        }
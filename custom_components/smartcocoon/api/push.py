@@ -0,0 +1,126 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Iterable
+import logging
+from typing import Any
+
+try:
+    import aiomqtt
+except ImportError:  # pragma: no cover
+    aiomqtt = None
+
+from .codec import DEFAULT_CODEC, Codec
+from .const import (
+    DEFAULT_MQTT_PORT,
+    MQTT_RECONNECT_INTERVAL_MAX,
+    MQTT_RECONNECT_INTERVAL_MIN,
+    MQTT_STATE_TOPIC,
+)
+from .fan import Fan
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_task(coroutine: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+    """Create a task on the running loop."""
+    return asyncio.create_task(coroutine, name=name)
+
+
+class Push:
+    """Push transport subscribing to fan state over MQTT."""
+
+    def __init__(
+        self,
+        host: str,
+        callback: Callable[[int, dict[str, Any]], None],
+        port: int = DEFAULT_MQTT_PORT,
+        codec: Codec = DEFAULT_CODEC,
+        task_factory: Callable[[Coroutine[Any, Any, None], str], asyncio.Task]
+        | None = None,
+    ) -> None:
+        """Initialize."""
+        self.codec = codec
+        self.host = host
+        self.port = port
+        self.callback = callback
+        self.task_factory = task_factory or create_task
+        self.tasks: dict[int, asyncio.Task] = {}
+
+    def update_fans(self, fans: Iterable[Fan]) -> None:
+        """Subscribe to new fans and unsubscribe from removed fans."""
+        fans = {
+            fan.id: fan
+            for fan in fans
+            if fan.id is not None and fan.mqtt_username and fan.mqtt_password
+        }
+        for fan_id in set(self.tasks) - set(fans):
+            _LOGGER.debug("Unsubscribing from fan: %s", fan_id)
+            self.tasks.pop(fan_id).cancel()
+        for fan_id, fan in fans.items():
+            if fan_id not in self.tasks or self.tasks[fan_id].done():
+                _LOGGER.debug("Subscribing to fan: %s", fan_id)
+                self.tasks[fan_id] = self.task_factory(
+                    self.subscribe(
+                        fan_id=fan_id,
+                        topic=MQTT_STATE_TOPIC.format(
+                            fan_id=fan.fan_id,
+                            mqtt_username=fan.mqtt_username,
+                        ),
+                        username=fan.mqtt_username,
+                        password=fan.mqtt_password,
+                    ),
+                    f"smartcocoon_push_{fan_id}",
+                )
+
+    async def subscribe(
+        self,
+        fan_id: int,
+        topic: str,
+        username: str | None,
+        password: str | None,
+    ) -> None:
+        """Subscribe to a fan state topic, reconnecting as required."""
+        interval = MQTT_RECONNECT_INTERVAL_MIN
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    hostname=self.host,
+                    port=self.port,
+                    username=username,
+                    password=password,
+                ) as client:
+                    await client.subscribe(topic)
+                    interval = MQTT_RECONNECT_INTERVAL_MIN
+                    async for message in client.messages:
+                        self.handle_message(fan_id=fan_id, payload=message.payload)
+            except aiomqtt.MqttError as exception:
+                _LOGGER.debug(
+                    "%s for fan: %s, reconnecting in %s seconds (%s)",
+                    type(exception).__name__,
+                    fan_id,
+                    interval,
+                    exception,
+                )
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, MQTT_RECONNECT_INTERVAL_MAX)
+
+    def handle_message(self, fan_id: int, payload: Any) -> None:
+        """Handle a fan state message."""
+        try:
+            data = self.codec.loads(payload)
+        except (TypeError, ValueError):
+            _LOGGER.debug("Ignoring invalid payload for fan: %s", fan_id)
+            return
+        if isinstance(data, dict) and data:
+            self.callback(fan_id, data)
+
+    async def stop(self) -> None:
+        """Cancel all subscriptions."""
+        tasks = list(self.tasks.values())
+        self.tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,109 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CIRCUIT_BREAKER_THRESHOLD,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+
+
+class SmartCocoonCircuitOpenError(Exception):
+    """Exception to indicate requests are suspended after repeated failures."""
+
+
+def is_transient(exception: BaseException) -> bool:
+    """Return True if a request failed in a way that may succeed if retried."""
+    if isinstance(exception, aiohttp.ClientResponseError):
+        return exception.status == 429 or exception.status >= 500
+    return isinstance(exception, (aiohttp.ClientConnectionError, TimeoutError))
+
+
+def retry_after(exception: BaseException) -> float | None:
+    """Return the delay requested by a Retry-After header, if any."""
+    if (
+        not isinstance(exception, aiohttp.ClientResponseError)
+        or exception.status not in (429, 503)
+        or not exception.headers
+        or (value := exception.headers.get("Retry-After")) is None
+    ):
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+    return max((date - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def backoff(attempt: int) -> float:
+    """Return a jittered exponential backoff delay for a retry attempt."""
+    return random.uniform(0, min(RETRY_BACKOFF_BASE * 2**attempt, RETRY_BACKOFF_MAX))
+
+
+class CircuitBreaker:
+    """Circuit breaker failing requests fast during an outage."""
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+        reset_timeout: float = CIRCUIT_BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self.failures = 0
+        self.opened: float | None = None
+        self.reset_timeout = reset_timeout
+        self.threshold = threshold
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Return the circuit state."""
+        if self.opened is None:
+            return "closed"
+        if time.monotonic() - self.opened < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def check(self) -> None:
+        """Raise if the circuit is open."""
+        if self.state == "open":
+            raise SmartCocoonCircuitOpenError(
+                f"Circuit open after {self.failures} consecutive failures"
+            )
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self.opened = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.opened is not None or self.failures >= self.threshold:
+            if self.opened is None:
+                self.trips += 1
+            self.opened = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        return {
+            "failures": self.failures,
+            "state": self.state,
+            "trips": self.trips,
+        }
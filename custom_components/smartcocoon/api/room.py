@@ -2,31 +2,43 @@
 
 from __future__ import annotations
 
+from collections.abc import Container
+from typing import Any
+
 from .fan import Fan
 
 
 class Room:
     """Room."""
 
-    def __init__(self, api, system, data) -> None:
-        """Initialize."""
+    __slots__ = ("api", "data", "fans", "id", "name", "system")
+
+    id: int | None
+    name: str | None
+
+    def __init__(
+        self,
+        api,
+        system,
+        data: dict[str, Any],
+        fan_ids: Container[int] | None = None,
+    ) -> None:
+        """Initialize, keeping only the given fans if fan IDs are given."""
         self.api = api
         self.system = system
-        self.data = data
-
-    @property
-    def id(self) -> int | None:
-        """ID."""
-        return self.data.get("id")
-
-    @property
-    def name(self) -> str | None:
-        """Name."""
-        return self.data.get("name")
-
-    @property
-    def fans(self) -> list[Fan]:
-        """Fans."""
-        return [
-            Fan(self.api, self.system, self, fan) for fan in self.data.get("fans", [])
+        self.data = data if api.save_location else None
+        self.id = data.get("id")
+        self.name = data.get("name")
+        self.fans: list[Fan] = [
+            Fan(api, system, self, fan)
+            for fan in data.get("fans", [])
+            if fan_ids is None or fan.get("id") in fan_ids
         ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "fans": [fan.as_dict() for fan in self.fans],
+        }
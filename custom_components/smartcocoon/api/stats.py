@@ -0,0 +1,124 @@
+"""Smart Cocoon API."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import re
+import time
+from typing import Any
+
+from aiohttp import ClientResponseError
+
+from .const import LATENCY_BUCKETS
+
+
+class EndpointStats:
+    """Request statistics for a single endpoint."""
+
+    __slots__ = (
+        "bytes",
+        "errors",
+        "last_error",
+        "last_latency",
+        "last_success",
+        "latency_buckets",
+        "latency_total",
+        "requests",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.bytes = 0
+        self.errors: dict[str, int] = {}
+        self.last_error: float | None = None
+        self.last_latency: float | None = None
+        self.last_success: float | None = None
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+        self.requests = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        return {
+            "bytes": self.bytes,
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+            "last_latency": self.last_latency,
+            "last_success": self.last_success,
+            "latency_average": self.latency_total / self.requests
+            if self.requests
+            else None,
+            "latency_histogram": {
+                f"le_{bucket}": count
+                for bucket, count in zip(
+                    (*LATENCY_BUCKETS, "inf"), self.latency_buckets, strict=True
+                )
+            },
+            "requests": self.requests,
+        }
+
+
+class Stats:
+    """Request statistics keyed by endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    @staticmethod
+    def endpoint(method: str, path: str) -> str:
+        """Return the endpoint key for a request, with IDs replaced."""
+        path = re.sub(r"/\d+", "/{id}", path)
+        return f"{method} {path}"
+
+    @staticmethod
+    def error(exception: BaseException) -> str:
+        """Return the error key for an exception."""
+        if isinstance(exception, ClientResponseError):
+            return f"http_{exception.status}"
+        if isinstance(exception, TimeoutError):
+            return "timeout"
+        if isinstance(exception, asyncio.CancelledError):
+            return "cancelled"
+        return type(exception).__name__
+
+    def record(
+        self,
+        endpoint: str,
+        latency: float,
+        size: int = 0,
+        error: str | None = None,
+    ) -> None:
+        """Record a request."""
+        if (stats := self.endpoints.get(endpoint)) is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.requests += 1
+        stats.bytes += size
+        stats.last_latency = latency
+        stats.latency_total += latency
+        stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if error is None:
+            stats.last_success = time.time()
+        else:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+            stats.last_error = time.time()
+
+    @property
+    def requests(self) -> int:
+        """Total number of requests."""
+        return sum(stats.requests for stats in self.endpoints.values())
+
+    @property
+    def bytes(self) -> int:
+        """Total number of bytes received."""
+        return sum(stats.bytes for stats in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        """Total number of errors."""
+        return sum(sum(stats.errors.values()) for stats in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        return {endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()}
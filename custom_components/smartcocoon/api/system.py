@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Container
 from typing import Any
 
 from .room import Room
@@ -10,20 +11,70 @@ from .room import Room
 class System:
     """System."""
 
-    def __init__(self, api, data) -> None:
-        """Initialize."""
+    __slots__ = (
+        "api",
+        "data",
+        "id",
+        "location_city",
+        "location_country",
+        "location_id",
+        "location_postal_code",
+        "location_state",
+        "location_street",
+        "name",
+        "rooms",
+        "user_id",
+    )
+
+    id: int | None
+    name: str | None
+    user_id: int | None
+    location_id: int | None
+    location_street: str | None
+    location_city: str | None
+    location_state: str | None
+    location_country: str | None
+    location_postal_code: str | None
+
+    def __init__(
+        self, api, data: dict[str, Any], fan_ids: Container[int] | None = None
+    ) -> None:
+        """Initialize, keeping only rooms and fans with the given fan IDs if given."""
         self.api = api
-        self.data = data
-
-    @property
-    def id(self) -> int | None:
-        """ID."""
-        return self.data.get("id")
-
-    @property
-    def name(self) -> str | None:
-        """Name."""
-        return self.data.get("name")
+        self.data = data if api.save_location else None
+        self.id = data.get("id")
+        self.name = data.get("name")
+        self.user_id = data.get("user_id")
+        location = data.get("location") or {}
+        self.location_id = location.get("id")
+        self.location_street = location.get("street")
+        self.location_city = location.get("city")
+        self.location_state = location.get("state")
+        self.location_country = location.get("country")
+        self.location_postal_code = location.get("postal_code")
+        self.rooms: list[Room] = [
+            Room(api, self, room, fan_ids)
+            for room in data.get("rooms", [])
+            if fan_ids is None
+            or any(fan.get("id") in fan_ids for fan in room.get("fans", []))
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "user_id": self.user_id,
+            "location": {
+                "id": self.location_id,
+                "street": self.location_street,
+                "city": self.location_city,
+                "state": self.location_state,
+                "country": self.location_country,
+                "postal_code": self.location_postal_code,
+            },
+            "rooms": [room.as_dict() for room in self.rooms],
+        }
 
     @property
     def name_location(self) -> str | None:
@@ -33,48 +84,3 @@ class System:
         if self.location_postal_code:
             return f"{self.name} ({self.location_postal_code})"
         return self.name
-
-    @property
-    def user_id(self) -> int | None:
-        """User ID."""
-        return self.data.get("user_id")
-
-    @property
-    def location(self) -> dict[str, Any]:
-        """Location."""
-        return self.data.get("location", {})
-
-    @property
-    def location_id(self) -> int | None:
-        """Location ID."""
-        return self.location.get("id")
-
-    @property
-    def location_street(self) -> str | None:
-        """Location street."""
-        return self.location.get("street")
-
-    @property
-    def location_city(self) -> str | None:
-        """Location city."""
-        return self.location.get("city")
-
-    @property
-    def location_state(self) -> str | None:
-        """Location state."""
-        return self.location.get("state")
-
-    @property
-    def location_country(self) -> str | None:
-        """Location country."""
-        return self.location.get("country")
-
-    @property
-    def location_postal_code(self) -> str | None:
-        """Location postal code."""
-        return self.location.get("postal_code")
-
-    @property
-    def rooms(self) -> list[Room]:
-        """Location rooms."""
-        return [Room(self.api, self, room) for room in self.data.get("rooms", [])]
@@ -10,12 +10,13 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import SmartCocoonEntity
-from .const import CONF_FANS, CONF_SYSTEMS, DATA_COORDINATOR, DOMAIN
+from . import SmartCocoonEntity, async_add_fan_entities
+from .api.fan import Fan as SmartCocoonFan
+from .coordinator import SmartCocoonCoordinator
 
 
 @dataclass(frozen=True)
@@ -40,28 +41,25 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up a SmartCocoon binary sensor entity based on a config entry."""
-    entry = hass.data[DOMAIN][config_entry.entry_id]
-    coordinator = entry[DATA_COORDINATOR]
-    entities: list[SmartCocoonBinarySensorEntity] = []
-
-    for system in coordinator.data:
-        if system.id in entry[CONF_SYSTEMS]:
-            for room in system.rooms:
-                for fan in room.fans:
-                    if fan.id in entry[CONF_FANS]:
-                        entities.extend(
-                            SmartCocoonBinarySensorEntity(
-                                coordinator=coordinator,
-                                system_id=system.id,
-                                room_id=room.id,
-                                fan_id=fan.id,
-                                entity_description=description,
-                            )
-                            for description in BINARY_SENSOR_DESCRIPTIONS
-                            if hasattr(fan, description.key)
-                        )
-
-    async_add_entities(entities)
+
+    @callback
+    def create_entities(
+        coordinator: SmartCocoonCoordinator, fan: SmartCocoonFan
+    ) -> list[SmartCocoonBinarySensorEntity]:
+        """Create the entities of a fan."""
+        return [
+            SmartCocoonBinarySensorEntity(
+                coordinator=coordinator,
+                system_id=fan.system.id,
+                room_id=fan.room.id,
+                fan_id=fan.id,
+                entity_description=description,
+            )
+            for description in BINARY_SENSOR_DESCRIPTIONS
+            if hasattr(fan, description.key)
+        ]
+
+    async_add_fan_entities(hass, config_entry, async_add_entities, create_entities)
 
 
 class SmartCocoonBinarySensorEntity(BinarySensorEntity, SmartCocoonEntity):
@@ -72,4 +70,4 @@ class SmartCocoonBinarySensorEntity(BinarySensorEntity, SmartCocoonEntity):
     @property
     def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
-        return getattr(self.fan, self.entity_description.key)
+        return getattr(self.fan, self.entity_description.key, None)
@@ -1,9 +1,12 @@
 """Adds config flow for SmartCocoon integration."""
 
+import asyncio
 import logging
+import time
 from types import MappingProxyType
 from typing import Any
 
+from aiohttp import ClientError
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -14,10 +17,12 @@ from homeassistant.const import (
     UnitOfTime,
 )
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     BooleanSelector,
     NumberSelector,
     NumberSelectorConfig,
+    NumberSelectorMode,
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
@@ -27,14 +32,22 @@ from homeassistant.helpers.selector import (
 )
 
 from .api import SmartCocoonAPI, SmartCocoonAuthError
-from .api.system import System as SmartCocoonSystem
+from .api.const import DEFAULT_MQTT_PORT
+from .api.data import Data as SmartCocoonData
+from .api.retry import SmartCocoonCircuitOpenError
 from .const import (
     CONF_AUTHORIZATION,
+    CONF_AUTO_INCLUDE_FANS,
     CONF_FANS,
+    CONF_MQTT_HOST,
+    CONF_MQTT_PORT,
     CONF_SAVE_RESPONSES,
     CONF_SYSTEMS,
     CONF_TIMEOUT,
-    DATA_COORDINATOR,
+    DATA_API,
+    DATA_COORDINATORS,
+    DATA_OPTIONS,
+    DEFAULT_AUTO_INCLUDE_FANS,
     DEFAULT_SAVE_RESPONSES,
     DOMAIN,
     ScanInterval,
@@ -55,7 +68,7 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize."""
         self.api: SmartCocoonAPI = SmartCocoonAPI()
         self.index = 0
-        self.response: list[SmartCocoonSystem] = []
+        self.response: SmartCocoonData = SmartCocoonData([])
         self.user_input: dict[str, Any] = {}
 
     @property
@@ -70,7 +83,7 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             self.user_input[CONF_EMAIL] = user_input[CONF_EMAIL]
             self.user_input[CONF_PASSWORD] = user_input[CONF_PASSWORD]
-            self.api = SmartCocoonAPI()
+            self.api = SmartCocoonAPI(session=async_get_clientsession(self.hass))
 
             try:
                 await self.api.login(
@@ -128,6 +141,9 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             for system in self.response:
                 if system.name_location in user_input[CONF_SYSTEMS]:
                     self.user_input[CONF_SYSTEMS].append(system.id)
+            self.user_input[CONF_AUTO_INCLUDE_FANS] = user_input.get(
+                CONF_AUTO_INCLUDE_FANS, DEFAULT_AUTO_INCLUDE_FANS
+            )
 
             return await self.async_step_fans()
 
@@ -150,6 +166,9 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             sort=True,
                         )
                     ),
+                    vol.Optional(
+                        CONF_AUTO_INCLUDE_FANS, default=DEFAULT_AUTO_INCLUDE_FANS
+                    ): BooleanSelector(),
                 }
             ),
             errors=errors,
@@ -216,6 +235,8 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self.user_input[CONF_SAVE_RESPONSES] = user_input[CONF_SAVE_RESPONSES]
             self.user_input[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
             self.user_input[CONF_TIMEOUT] = user_input[CONF_TIMEOUT]
+            self.user_input[CONF_MQTT_HOST] = user_input.get(CONF_MQTT_HOST, "")
+            self.user_input[CONF_MQTT_PORT] = user_input[CONF_MQTT_PORT]
             return self.async_create_entry(
                 title=self.config_title, data=self.user_input
             )
@@ -245,6 +266,16 @@ class SmartCocoonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             unit_of_measurement=UnitOfTime.SECONDS,
                         )
                     ),
+                    vol.Optional(CONF_MQTT_HOST, default=""): TextSelector(),
+                    vol.Optional(
+                        CONF_MQTT_PORT, default=DEFAULT_MQTT_PORT
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=1,
+                            max=65535,
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
                 }
             ),
         )
@@ -261,8 +292,7 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
 
     def __init__(self) -> None:
         """Initialize SmartCocoon options flow."""
-        self.coordinator = None
-        self.coordinator_data: list[SmartCocoonSystem] = []
+        self.coordinator_data: SmartCocoonData = SmartCocoonData([])
         self.index = 0
         self.user_input = {}
 
@@ -278,10 +308,34 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        self.coordinator = self.hass.data[DOMAIN][self.config_entry.entry_id][
-            DATA_COORDINATOR
-        ]
-        self.coordinator_data = self.coordinator.data
+        entry = self.hass.data[DOMAIN][self.config_entry.entry_id]
+        timeout = entry[DATA_OPTIONS][CONF_TIMEOUT]
+        try:
+            # Coordinators only hold the enabled systems and fans, list all
+            # without replacing the models cached for polling
+            async with asyncio.timeout(timeout):
+                self.coordinator_data = await entry[DATA_API].update(
+                    deadline=time.monotonic() + timeout, cache_models=False
+                )
+        except (
+            ClientError,
+            SmartCocoonAuthError,
+            SmartCocoonCircuitOpenError,
+            TimeoutError,
+        ) as exception:
+            _LOGGER.warning(
+                "%s while listing systems, showing enabled systems only: %s",
+                type(exception).__name__,
+                exception,
+            )
+            self.coordinator_data = SmartCocoonData(
+                [
+                    system
+                    for coordinator in entry[DATA_COORDINATORS].values()
+                    if coordinator.data
+                    for system in coordinator.data
+                ]
+            )
         return await self.async_step_systems()
 
     async def async_step_systems(self, user_input=None):
@@ -292,6 +346,9 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
                 for system in self.coordinator_data
                 if system.name_location in user_input[CONF_SYSTEMS]
             ]
+            self.user_input[CONF_AUTO_INCLUDE_FANS] = user_input.get(
+                CONF_AUTO_INCLUDE_FANS, DEFAULT_AUTO_INCLUDE_FANS
+            )
             return await self.async_step_fans()
 
         conf_systems = [
@@ -304,6 +361,10 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
             for system in self.coordinator_data
             if system.name_location
         ]
+        conf_auto_include_fans = self.options.get(
+            CONF_AUTO_INCLUDE_FANS,
+            self.data.get(CONF_AUTO_INCLUDE_FANS, DEFAULT_AUTO_INCLUDE_FANS),
+        )
 
         return self.async_show_form(
             step_id="systems",
@@ -317,6 +378,9 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
                             sort=True,
                         )
                     ),
+                    vol.Optional(
+                        CONF_AUTO_INCLUDE_FANS, default=conf_auto_include_fans
+                    ): BooleanSelector(),
                 }
             ),
         )
@@ -381,6 +445,8 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
             self.user_input[CONF_SAVE_RESPONSES] = user_input[CONF_SAVE_RESPONSES]
             self.user_input[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
             self.user_input[CONF_TIMEOUT] = user_input[CONF_TIMEOUT]
+            self.user_input[CONF_MQTT_HOST] = user_input.get(CONF_MQTT_HOST, "")
+            self.user_input[CONF_MQTT_PORT] = user_input[CONF_MQTT_PORT]
             return self.async_create_entry(title="", data=self.user_input)
 
         conf_save_responses = self.options.get(
@@ -393,6 +459,12 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
         conf_timeout = self.options.get(
             CONF_TIMEOUT, self.data.get(CONF_TIMEOUT, Timeout.DEFAULT)
         )
+        conf_mqtt_host = self.options.get(
+            CONF_MQTT_HOST, self.data.get(CONF_MQTT_HOST, "")
+        )
+        conf_mqtt_port = self.options.get(
+            CONF_MQTT_PORT, self.data.get(CONF_MQTT_PORT, DEFAULT_MQTT_PORT)
+        )
 
         return self.async_show_form(
             step_id="advanced",
@@ -419,6 +491,18 @@ class SmartCocoonOptionsFlowHandler(config_entries.OptionsFlow):
                             unit_of_measurement=UnitOfTime.SECONDS,
                         )
                     ),
+                    vol.Optional(
+                        CONF_MQTT_HOST, default=conf_mqtt_host
+                    ): TextSelector(),
+                    vol.Optional(
+                        CONF_MQTT_PORT, default=conf_mqtt_port
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=1,
+                            max=65535,
+                            mode=NumberSelectorMode.BOX,
+                        )
+                    ),
                 }
             ),
         )
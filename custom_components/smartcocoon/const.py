@@ -2,23 +2,45 @@
 
 from enum import IntEnum
 
+ATTR_MODE = "mode"
+ATTR_SPEED_LEVEL = "speed_level"
+ATTR_STALE_SINCE = "stale_since"
+
 CONF_ACCESS_TOKEN = "access_token"
 CONF_AUTHORIZATION = "authorization"
+CONF_AUTO_INCLUDE_FANS = "auto_include_fans"
 CONF_CLIENT = "client"
 CONF_FANS = "fans"
+CONF_MQTT_HOST = "mqtt_host"
+CONF_MQTT_PORT = "mqtt_port"
 CONF_SAVE_RESPONSES = "save_responses"
 CONF_SYSTEMS = "systems"
 CONF_TIMEOUT = "timeout"
 
 CONFIGURATION_URL = "https://mysmartcocoon.com"
 
-DATA_COORDINATOR = "coordinator"
+DATA_API = "api"
+DATA_COORDINATORS = "coordinators"
+DATA_KNOWN_FANS = "known_fans"
+DATA_KNOWN_ROOMS = "known_rooms"
+DATA_LIMITER = "limiter"
+DATA_OPTIONS = "options"
+DATA_PHASES = "phases"
+DATA_PUSH = "push"
+DATA_SNAPSHOT = "snapshot"
+DATA_STORES = "stores"
 
 DOMAIN = "smartcocoon"
 
+SERVICE_SET_FANS = "set_fans"
+
+SIGNAL_ADD_COORDINATOR = f"{DOMAIN}_{{entry_id}}_add_coordinator"
+SIGNAL_REMOVE_FANS = f"{DOMAIN}_{{entry_id}}_remove_fans"
+
 UNDO_UPDATE_LISTENER = "undo_update_listener"
 
 
+DEFAULT_AUTO_INCLUDE_FANS = False
 DEFAULT_SAVE_LOCATION = f"/config/custom_components/{DOMAIN}/api/responses"
 DEFAULT_SAVE_RESPONSES = False
 
@@ -26,6 +48,23 @@ DEFAULT_SAVE_RESPONSES = False
 DEVICE_MANUFACTURER = "Smart Cocoon"
 
 
+FAN_REMOVAL_POLLS = 2
+
+POLL_BACKOFF_FACTOR = 2
+POLL_JITTER = 0.1
+POLL_STAGGER_SLOTS = 10
+POLL_STAGGER_STEP = 3
+
+REQUEST_REFRESH_COOLDOWN = 3
+
+STALE_DATA_MAX_AGE = 3600
+
+STATS_UPDATE = "update"
+
+STORAGE_SAVE_DELAY = 30
+STORAGE_VERSION = 1
+
+
 class ScanInterval(IntEnum):
     """Scan interval."""
 
@@ -0,0 +1,354 @@
+"""Data update coordinator for the SmartCocoon integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Collection, Iterable
+from datetime import timedelta
+import logging
+import random
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import SmartCocoonAPI, SmartCocoonAuthError
+from .api.data import Data as SmartCocoonData
+from .api.retry import SmartCocoonCircuitOpenError, is_transient, retry_after
+from .api.stats import Stats
+from .const import (
+    DATA_STORES,
+    DOMAIN,
+    FAN_REMOVAL_POLLS,
+    POLL_BACKOFF_FACTOR,
+    POLL_JITTER,
+    REQUEST_REFRESH_COOLDOWN,
+    STALE_DATA_MAX_AGE,
+    STATS_UPDATE,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    ScanInterval,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_snapshot_store(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> Store[dict[str, Any]]:
+    """Return the snapshot store of a config entry, the same for its lifetime."""
+    stores = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_STORES, {})
+    if (store := stores.get(config_entry.entry_id)) is None:
+        store = stores[config_entry.entry_id] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}"
+        )
+    return store
+
+
+class SmartCocoonSnapshot:
+    """Last good data of all systems of a config entry, persisted across runs."""
+
+    def __init__(
+        self, hass: HomeAssistant, config_entry: ConfigEntry, api: SmartCocoonAPI
+    ) -> None:
+        """Initialize."""
+        self.api = api
+        self.coordinators: dict[int, SmartCocoonCoordinator] = {}
+        self.pending = False
+        self.store = async_get_snapshot_store(hass, config_entry)
+
+    async def async_load(self) -> SmartCocoonData | None:
+        """Load the last good data persisted by a previous run."""
+        if not (snapshot := await self.store.async_load()):
+            return None
+        try:
+            return self.api.parse(snapshot["systems"])
+        except (AttributeError, KeyError, TypeError) as exception:
+            _LOGGER.warning(
+                "%s while loading snapshot: %s", type(exception).__name__, exception
+            )
+            return None
+
+    def take_data(self) -> dict[str, Any]:
+        """Return the current data as the pending save is written."""
+        self.pending = False
+        return {
+            "systems": [
+                system.as_dict()
+                for coordinator in self.coordinators.values()
+                if coordinator.data
+                for system in coordinator.data
+            ]
+        }
+
+    @callback
+    def async_save(self) -> None:
+        """Persist the current data of all coordinators, debounced."""
+        self.pending = True
+        self.store.async_delay_save(self.take_data, STORAGE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Persist a pending save now, e.g. before unloading."""
+        if self.pending:
+            await self.store.async_save(self.take_data())
+
+
+class SmartCocoonCoordinator(DataUpdateCoordinator[SmartCocoonData]):
+    """Coordinator polling a SmartCocoon system with an adaptive interval."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        api: SmartCocoonAPI,
+        snapshot: SmartCocoonSnapshot,
+        name: str,
+        system_id: int,
+        scan_interval: float,
+        timeout: float,
+        target_fans: Collection[int] | None = None,
+        jitter: float = POLL_JITTER,
+        phase: float = 0,
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            hass=hass,
+            logger=_LOGGER,
+            config_entry=config_entry,
+            name=name,
+            update_interval=timedelta(seconds=scan_interval),
+            always_update=False,
+            request_refresh_debouncer=Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=REQUEST_REFRESH_COOLDOWN,
+                immediate=False,
+            ),
+        )
+        self.api = api
+        self.interval = float(scan_interval)
+        self.jitter = jitter
+        self.missing_fans: dict[int, int] = {}
+        self.phase = phase
+        self.scan_interval = float(scan_interval)
+        self.snapshot = snapshot
+        self.stale_since: float | None = None
+        self.stats = Stats()
+        self.system_id = system_id
+        self.target_fans = target_fans
+        self.timeout = timeout
+
+    @callback
+    def async_set_options(self, scan_interval: float, timeout: float) -> None:
+        """Apply a new idle interval and timeout to the running coordinator."""
+        self.scan_interval = float(scan_interval)
+        self.timeout = timeout
+        self.set_interval(min(self.interval, self.scan_interval))
+        if self._unsub_refresh:
+            # Reschedule the pending poll with the new interval
+            self._schedule_refresh()
+
+    @callback
+    def async_note_command(self) -> None:
+        """Poll at the minimum interval after a command."""
+        self.set_interval(ScanInterval.MIN)
+
+    @callback
+    def async_save_snapshot(self) -> None:
+        """Persist the current data, debounced."""
+        self.snapshot.async_save()
+
+    @callback
+    def async_patch_fan(self, fan_id: int, data: dict[str, Any]) -> None:
+        """Patch a fan in the current data and notify its entities."""
+        if self.data and self.data.patch_fan(fan_id, data):
+            # The patched system no longer matches its cached model
+            self.api.models.pop(self.system_id, None)
+            self.async_save_snapshot()
+            self.async_update_listeners()
+
+    async def async_set_fan(self, fan_id: int, data: dict[str, Any]) -> None:
+        """Write fan properties, refreshing if required to reconcile."""
+        if await self.async_write_fan(fan_id, data):
+            await self.async_request_refresh()
+
+    async def async_set_fans(
+        self, fan_ids: Iterable[int], data: dict[str, Any]
+    ) -> dict[int, Exception | None]:
+        """Write the same fan properties to several fans concurrently."""
+        semaphore = asyncio.Semaphore(self.api.concurrency_limit)
+
+        async def write(fan_id: int) -> bool:
+            if not self.data or fan_id not in self.data.fans:
+                raise HomeAssistantError(f"Fan {fan_id} not found")
+            async with semaphore:
+                return await self.async_write_fan(fan_id, data)
+
+        fan_ids = list(dict.fromkeys(fan_ids))
+        results = await asyncio.gather(
+            *(write(fan_id) for fan_id in fan_ids), return_exceptions=True
+        )
+        if any(result is True for result in results):
+            await self.async_request_refresh()
+        errors: dict[int, Exception | None] = {}
+        for fan_id, result in zip(fan_ids, results, strict=True):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+            errors[fan_id] = result if isinstance(result, Exception) else None
+        return errors
+
+    async def async_write_fan(self, fan_id: int, data: dict[str, Any]) -> bool:
+        """Write fan properties with an optimistic state update."""
+        if not self.data or (fan := self.data.fans.get(fan_id)) is None:
+            return False
+        snapshot = self.data
+        state = fan.optimistic_state(data)
+        previous = {key: getattr(fan, key) for key in state}
+        self.async_patch_fan(fan_id, state)
+        try:
+            result = await self.api.write(
+                fan_id=fan_id, data=data, system_id=self.system_id
+            )
+        except Exception as exception:
+            if self.data is snapshot:
+                self.async_patch_fan(fan_id, previous)
+            raise HomeAssistantError(
+                f"{type(exception).__name__} while writing fan {fan_id}: {exception}"
+            ) from exception
+        self.async_note_command()
+        if isinstance(result, dict):
+            result = result.get("fan", result)
+        if isinstance(result, dict) and result.get("id") == fan_id:
+            if self.data is snapshot:
+                self.async_patch_fan(fan_id, result)
+            return False
+        return True
+
+    def record_update(
+        self, start: float, exception: BaseException | None = None
+    ) -> None:
+        """Record the duration and outcome of an update."""
+        self.stats.record(
+            endpoint=STATS_UPDATE,
+            latency=time.monotonic() - start,
+            error=self.stats.error(exception) if exception else None,
+        )
+
+    def set_interval(self, interval: float) -> None:
+        """Set the base interval and apply jitter and phase to the next poll."""
+        self.interval = interval
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.update_interval = timedelta(seconds=interval + self.phase)
+        self.phase = 0
+
+    async def _async_update_data(self) -> SmartCocoonData:
+        """Fetch data from API endpoint."""
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await self.api.update(
+                    target_systems=[self.system_id],
+                    deadline=start + self.timeout,
+                    target_fans=self.target_fans,
+                    sibling_systems=self.snapshot.coordinators.keys()
+                    if self.api.bulk_rooms is not False
+                    else (),
+                )
+        except SmartCocoonAuthError as exception:
+            self.record_update(start, exception)
+            raise ConfigEntryAuthFailed from exception
+        except Exception as exception:
+            self.record_update(start, exception)
+            if not (
+                is_transient(exception)
+                or isinstance(exception, SmartCocoonCircuitOpenError)
+            ):
+                raise UpdateFailed(
+                    f"{type(exception).__name__} while communicating with API: {exception}"
+                ) from exception
+            interval = max(self.interval, self.scan_interval) * POLL_BACKOFF_FACTOR
+            if (delay := retry_after(exception)) is not None:
+                interval = max(interval, delay)
+            self.set_interval(min(interval, ScanInterval.MAX))
+            return self.serve_stale(exception)
+        self.record_update(start)
+        if result.systems.keys() - {self.system_id}:
+            # A bulk request also updated the sibling systems
+            for system_id, system in result.systems.items():
+                if system_id != self.system_id and (
+                    sibling := self.snapshot.coordinators.get(system_id)
+                ):
+                    sibling.async_set_shared_data(SmartCocoonData([system]))
+            system = result.systems.get(self.system_id)
+            result = SmartCocoonData([system] if system else [])
+        if self.stale_since is not None:
+            _LOGGER.info("Communication with API recovered, data is current")
+            self.stale_since = None
+            self.async_update_listeners()
+        self.apply_changes(result)
+        return result
+
+    @callback
+    def async_set_shared_data(self, data: SmartCocoonData) -> None:
+        """Apply data of this system polled by a sibling, restarting the interval."""
+        if self.stale_since is not None:
+            _LOGGER.info("Communication with API recovered, data is current")
+            self.stale_since = None
+        self.apply_changes(data)
+        self.async_set_updated_data(data)
+
+    def apply_changes(self, data: SmartCocoonData) -> None:
+        """Detect changed fans, persist them and set the next poll interval."""
+        self.count_missing_fans(data)
+        changed = data.diff(self.data)
+        _LOGGER.debug("Changed fans: %s", changed)
+        if changed:
+            self.async_save_snapshot()
+        if self.data is not None and changed:
+            self.set_interval(ScanInterval.MIN)
+        else:
+            self.set_interval(
+                min(self.interval * POLL_BACKOFF_FACTOR, self.scan_interval)
+            )
+
+    def count_missing_fans(self, data: SmartCocoonData) -> None:
+        """Count the consecutive polls each previously seen fan is missing from."""
+        if not data.fans:
+            # More likely a glitch than every fan of the system removed
+            return
+        previous = self.data.fans.keys() if self.data else set()
+        self.missing_fans = {
+            fan_id: self.missing_fans.get(fan_id, 0) + 1
+            for fan_id in (previous | self.missing_fans.keys()) - data.fans.keys()
+            if self.target_fans is None or fan_id in self.target_fans
+        }
+        # Notify listeners of unchanged data while removals are due
+        self.always_update = self.target_fans is None and any(
+            polls >= FAN_REMOVAL_POLLS for polls in self.missing_fans.values()
+        )
+
+    def serve_stale(self, exception: Exception) -> SmartCocoonData:
+        """Return the last good data after a transient failure, if recent enough."""
+        now = time.time()
+        if self.data is None or (
+            self.stale_since is not None and now - self.stale_since > STALE_DATA_MAX_AGE
+        ):
+            raise UpdateFailed(
+                f"{type(exception).__name__} while communicating with API: {exception}"
+            ) from exception
+        if self.stale_since is None:
+            _LOGGER.warning(
+                "%s while communicating with API, serving last good data: %s",
+                type(exception).__name__,
+                exception,
+            )
+            self.stale_since = now
+            self.async_update_listeners()
+        return self.data
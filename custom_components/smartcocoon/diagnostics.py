@@ -0,0 +1,70 @@
+"""Diagnostics support for the SmartCocoon integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_AUTHORIZATION, DATA_API, DATA_COORDINATORS, DOMAIN
+
+TO_REDACT = {
+    CONF_AUTHORIZATION,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    "mqtt_password",
+    "mqtt_username",
+    "street",
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    api = entry[DATA_API]
+    coordinators = entry[DATA_COORDINATORS]
+
+    return {
+        "entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "coordinators": {
+            system_id: {
+                "last_update_success": coordinator.last_update_success,
+                "interval": coordinator.interval,
+                "update_interval": coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None,
+                "stale_since": coordinator.stale_since,
+                "stats": coordinator.stats.as_dict(),
+            }
+            for system_id, coordinator in coordinators.items()
+        },
+        "api": {
+            "breaker": api.breaker.as_dict(),
+            "breakers": {
+                system_id: breaker.as_dict()
+                for system_id, breaker in api.breakers.items()
+            },
+            "bulk_rooms": api.bulk_rooms,
+            "cache_hits": api.cache_hits,
+            "limiter": api.limiter.as_dict() if api.limiter else None,
+            "retries": api.retries,
+            "stats": api.stats.as_dict(),
+            "system_timings": api.system_timings,
+        },
+        "data": async_redact_data(
+            [
+                system.as_dict()
+                for coordinator in coordinators.values()
+                if coordinator.data
+                for system in coordinator.data
+            ],
+            TO_REDACT,
+        ),
+    }
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import partial
 import logging
 from typing import Any
 
@@ -12,12 +13,23 @@ from homeassistant.components.fan import (
     FanEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import SmartCocoonEntity
+from . import (
+    SmartCocoonEntity,
+    async_add_fan_entities,
+    entry_device_info,
+    group_unique_id,
+)
 from .api.const import FanMode
-from .const import CONF_FANS, CONF_SYSTEMS, DATA_COORDINATOR, DOMAIN
+from .api.fan import Fan as SmartCocoonFan
+from .api.room import Room as SmartCocoonRoom
+from .api.system import System as SmartCocoonSystem
+from .const import DATA_COORDINATORS, DOMAIN
+from .coordinator import SmartCocoonCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,30 +46,51 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up a SmartCocoon fan entity based on a config entry."""
-    entry = hass.data[DOMAIN][config_entry.entry_id]
-    coordinator = entry[DATA_COORDINATOR]
-    entities: list[SmartCocoonFanEntity] = []
-
-    for system in coordinator.data:
-        if system.id in entry[CONF_SYSTEMS]:
-            for room in system.rooms:
-                entities.extend(
-                    SmartCocoonFanEntity(
-                        coordinator=coordinator,
-                        system_id=system.id,
-                        room_id=room.id,
-                        fan_id=fan.id,
-                        entity_description=SmartCocoonFanEntityDescription(
-                            key="fan",
-                            name=None,
-                        ),
-                    )
-                    for fan in room.fans
-                    if fan.id in entry[CONF_FANS]
+    """Set up SmartCocoon fan and fan group entities based on a config entry."""
+    groups: dict[SmartCocoonCoordinator, set[int | None]] = {}
+
+    @callback
+    def create_entities(
+        coordinator: SmartCocoonCoordinator, fan: SmartCocoonFan
+    ) -> list[FanEntity]:
+        """Create the entities of a fan, and of its room and system groups."""
+        entities: list[FanEntity] = []
+        # Groups of a removed coordinator are removed with it
+        for stale in groups.keys() - config_entry_coordinators():
+            del groups[stale]
+        coordinator_groups = groups.setdefault(coordinator, set())
+        for room_id in (None, fan.room.id):
+            if room_id not in coordinator_groups:
+                coordinator_groups.add(room_id)
+                group = SmartCocoonGroupFanEntity(
+                    coordinator=coordinator,
+                    config_entry=config_entry,
+                    system_id=fan.system.id,
+                    room_id=room_id,
                 )
-
-    async_add_entities(entities)
+                # Removed groups are created again if their room returns
+                group.async_on_remove(partial(coordinator_groups.discard, room_id))
+                entities.append(group)
+        entities.append(
+            SmartCocoonFanEntity(
+                coordinator=coordinator,
+                system_id=fan.system.id,
+                room_id=fan.room.id,
+                fan_id=fan.id,
+                entity_description=SmartCocoonFanEntityDescription(
+                    key="fan",
+                    name=None,
+                ),
+            )
+        )
+        return entities
+
+    @callback
+    def config_entry_coordinators() -> set[SmartCocoonCoordinator]:
+        """Return the current coordinators of the config entry."""
+        return set(hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS].values())
+
+    async_add_fan_entities(hass, config_entry, async_add_entities, create_entities)
 
 
 class SmartCocoonFanEntity(FanEntity, SmartCocoonEntity):
@@ -99,20 +132,124 @@ class SmartCocoonFanEntity(FanEntity, SmartCocoonEntity):
         **kwargs: Any,
     ) -> None:
         """Turn the entity on."""
-        if self.fan:
-            await self.fan.turn_on()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_fan(self.fan_id, {"mode": FanMode.ON})
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        if self.fan:
-            await self.fan.turn_off()
-            await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_fan(self.fan_id, {"mode": FanMode.OFF})
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
         if preset_mode not in self.preset_modes:
             _LOGGER.warning("Invalid preset mode: %s", preset_mode)
-        if self.fan:
-            await self.fan.set_mode(mode=preset_mode)
-            await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_fan(self.fan_id, {"mode": preset_mode})
+
+
+class SmartCocoonGroupFanEntity(CoordinatorEntity[SmartCocoonCoordinator], FanEntity):
+    """Representation of the SmartCocoon fans of a room or system as one fan."""
+
+    _attr_preset_modes = [FanMode.AUTO, FanMode.ECO]
+    _attr_supported_features = (
+        FanEntityFeature.TURN_OFF
+        | FanEntityFeature.TURN_ON
+        | FanEntityFeature.PRESET_MODE
+    )
+
+    def __init__(
+        self,
+        coordinator: SmartCocoonCoordinator,
+        config_entry: ConfigEntry,
+        system_id: int,
+        room_id: int | None = None,
+    ) -> None:
+        """Initialize the group of a system, or of a room if a room ID is given."""
+        super().__init__(coordinator)
+        self.system_id = system_id
+        self.room_id = room_id
+        self._attr_device_info = entry_device_info(config_entry)
+        self._attr_unique_id = group_unique_id(config_entry, system_id, room_id)
+        self._state: tuple[Any, ...] | None = None
+
+    @property
+    def group(self) -> SmartCocoonSystem | SmartCocoonRoom | None:
+        """Return the system or room of the group."""
+        if not (data := self.coordinator.data):
+            return None
+        if self.room_id is None:
+            return data.systems.get(self.system_id)
+        return data.rooms.get(self.room_id)
+
+    @property
+    def members(self) -> list[SmartCocoonFan]:
+        """Return the fans of the group."""
+        if (group := self.group) is None:
+            return []
+        if isinstance(group, SmartCocoonRoom):
+            return group.fans
+        return [fan for room in group.rooms for fan in room.fans]
+
+    @property
+    def name(self) -> str | None:
+        """Return the name of the entity."""
+        if (group := self.group) is None:
+            return None
+        return f"{group.name} Fans"
+
+    @property
+    def available(self) -> bool:
+        """Return True if any member fan is available."""
+        return super().available and any(fan.connected for fan in self.members)
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if any member fan is on."""
+        if not (members := self.members):
+            return None
+        return any(fan.fan_on for fan in members)
+
+    @property
+    def preset_mode(self) -> str | None:
+        """Return the mode shared by all member fans, if any."""
+        modes = {fan.mode for fan in self.members}
+        return modes.pop() if len(modes) == 1 else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the state of the group changed."""
+        state = (self.available, self.is_on, self.preset_mode, self.name)
+        if state == self._state:
+            return
+        self._state = state
+        super()._handle_coordinator_update()
+
+    async def async_set_members(self, data: dict[str, Any]) -> None:
+        """Write fan properties to all member fans."""
+        members = {fan.id: fan for fan in self.members}
+        errors = await self.coordinator.async_set_fans(members, data)
+        if failed := {
+            fan_id: error for fan_id, error in errors.items() if error is not None
+        }:
+            raise HomeAssistantError(
+                f"Failed to write {len(failed)} of {len(errors)} fans: "
+                + ", ".join(
+                    f"{members[fan_id].name} ({error})"
+                    for fan_id, error in failed.items()
+                )
+            )
+
+    async def async_turn_on(
+        self,
+        percentage: int | None = None,
+        preset_mode: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Turn the member fans on."""
+        await self.async_set_members({"mode": FanMode.ON})
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn the member fans off."""
+        await self.async_set_members({"mode": FanMode.OFF})
+
+    async def async_set_preset_mode(self, preset_mode: str) -> None:
+        """Set the mode of the member fans."""
+        await self.async_set_members({"mode": preset_mode})
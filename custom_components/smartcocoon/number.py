@@ -10,12 +10,13 @@ from homeassistant.components.number import (
     NumberEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import SmartCocoonEntity
-from .const import CONF_FANS, CONF_SYSTEMS, DATA_COORDINATOR, DOMAIN
+from . import SmartCocoonEntity, async_add_fan_entities
+from .api.fan import Fan as SmartCocoonFan
+from .coordinator import SmartCocoonCoordinator
 
 
 @dataclass(frozen=True)
@@ -47,28 +48,25 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up a SmartCocoon number entity based on a config entry."""
-    entry = hass.data[DOMAIN][config_entry.entry_id]
-    coordinator = entry[DATA_COORDINATOR]
-    entities: list[SmartCocoonNumberEntity] = []
-
-    for system in coordinator.data:
-        if system.id in entry[CONF_SYSTEMS]:
-            for room in system.rooms:
-                for fan in room.fans:
-                    if fan.id in entry[CONF_FANS]:
-                        entities.extend(
-                            SmartCocoonNumberEntity(
-                                coordinator=coordinator,
-                                system_id=system.id,
-                                room_id=room.id,
-                                fan_id=fan.id,
-                                entity_description=description,
-                            )
-                            for description in NUMBER_DESCRIPTIONS
-                            if hasattr(fan, description.key)
-                        )
-
-    async_add_entities(entities)
+
+    @callback
+    def create_entities(
+        coordinator: SmartCocoonCoordinator, fan: SmartCocoonFan
+    ) -> list[SmartCocoonNumberEntity]:
+        """Create the entities of a fan."""
+        return [
+            SmartCocoonNumberEntity(
+                coordinator=coordinator,
+                system_id=fan.system.id,
+                room_id=fan.room.id,
+                fan_id=fan.id,
+                entity_description=description,
+            )
+            for description in NUMBER_DESCRIPTIONS
+            if hasattr(fan, description.key)
+        ]
+
+    async_add_fan_entities(hass, config_entry, async_add_entities, create_entities)
 
 
 class SmartCocoonNumberEntity(NumberEntity, SmartCocoonEntity):
@@ -79,10 +77,10 @@ class SmartCocoonNumberEntity(NumberEntity, SmartCocoonEntity):
     @property
     def native_value(self) -> float | None:
         """Return the value reported by the number."""
-        return getattr(self.fan, self.entity_description.key)
+        return getattr(self.fan, self.entity_description.key, None)
 
     async def async_set_native_value(self, value: float) -> None:
         """Set new value."""
-        if self.fan:
-            await self.fan.set_property(self.entity_description.key, value)
-            await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_fan(
+            self.fan_id, {self.entity_description.key: int(value)}
+        )
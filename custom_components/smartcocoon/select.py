@@ -6,12 +6,13 @@ from dataclasses import dataclass
 
 from homeassistant.components.select import SelectEntity, SelectEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import SmartCocoonEntity
-from .const import CONF_FANS, CONF_SYSTEMS, DATA_COORDINATOR, DOMAIN
+from . import SmartCocoonEntity, async_add_fan_entities
+from .api.fan import Fan as SmartCocoonFan
+from .coordinator import SmartCocoonCoordinator
 
 
 @dataclass(frozen=True)
@@ -39,28 +40,25 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up a SmartCocoon select entity based on a config entry."""
-    entry = hass.data[DOMAIN][config_entry.entry_id]
-    coordinator = entry[DATA_COORDINATOR]
-    entities: list[SmartCocoonSelectEntity] = []
-
-    for system in coordinator.data:
-        if system.id in entry[CONF_SYSTEMS]:
-            for room in system.rooms:
-                for fan in room.fans:
-                    if fan.id in entry[CONF_FANS]:
-                        entities.extend(
-                            SmartCocoonSelectEntity(
-                                coordinator=coordinator,
-                                system_id=system.id,
-                                room_id=room.id,
-                                fan_id=fan.id,
-                                entity_description=description,
-                            )
-                            for description in SELECT_DESCRIPTIONS
-                            if hasattr(fan, description.key)
-                        )
-
-    async_add_entities(entities)
+
+    @callback
+    def create_entities(
+        coordinator: SmartCocoonCoordinator, fan: SmartCocoonFan
+    ) -> list[SmartCocoonSelectEntity]:
+        """Create the entities of a fan."""
+        return [
+            SmartCocoonSelectEntity(
+                coordinator=coordinator,
+                system_id=fan.system.id,
+                room_id=fan.room.id,
+                fan_id=fan.id,
+                entity_description=description,
+            )
+            for description in SELECT_DESCRIPTIONS
+            if hasattr(fan, description.key)
+        ]
+
+    async_add_fan_entities(hass, config_entry, async_add_entities, create_entities)
 
 
 class SmartCocoonSelectEntity(SelectEntity, SmartCocoonEntity):
@@ -72,16 +70,16 @@ class SmartCocoonSelectEntity(SelectEntity, SmartCocoonEntity):
     def options(self) -> list[str]:
         """Return a set of selectable options."""
         if self.entity_description.options_key:
-            return getattr(self.fan, self.entity_description.options_key)
+            return getattr(self.fan, self.entity_description.options_key, None) or []
         return []
 
     @property
     def current_option(self) -> str | None:
         """Return the selected entity option to represent the entity state."""
-        return getattr(self.fan, self.entity_description.key)
+        return getattr(self.fan, self.entity_description.key, None)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        if self.fan:
-            await self.fan.set_property(self.entity_description.key, option)
-            await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_fan(
+            self.fan_id, {self.entity_description.key: option}
+        )
@@ -0,0 +1,151 @@
+"""Support for SmartCocoon sensor entities."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from . import entry_device_info
+from .api import SmartCocoonAPI
+from .const import DATA_API, DATA_COORDINATORS, DOMAIN, STATS_UPDATE
+from .coordinator import SmartCocoonCoordinator
+
+
+def last_update_duration(
+    api: SmartCocoonAPI, coordinators: Iterable[SmartCocoonCoordinator]
+) -> float | None:
+    """Return the duration of the slowest last system update."""
+    durations = [
+        update.last_latency
+        for coordinator in coordinators
+        if (update := coordinator.stats.endpoints.get(STATS_UPDATE))
+        and update.last_latency is not None
+    ]
+    return round(max(durations), 3) if durations else None
+
+
+def last_update_success(
+    api: SmartCocoonAPI, coordinators: Iterable[SmartCocoonCoordinator]
+) -> datetime | None:
+    """Return the time of the oldest last successful system update."""
+    successes = [
+        update.last_success
+        for coordinator in coordinators
+        if (update := coordinator.stats.endpoints.get(STATS_UPDATE))
+        and update.last_success
+    ]
+    return datetime.fromtimestamp(min(successes), UTC) if successes else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class SmartCocoonSensorEntityDescription(SensorEntityDescription):
+    """Class to describe a SmartCocoon sensor entity."""
+
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
+    value_fn: Callable[
+        [SmartCocoonAPI, Iterable[SmartCocoonCoordinator]], StateType | datetime
+    ]
+
+
+SENSOR_DESCRIPTIONS: list[SmartCocoonSensorEntityDescription] = [
+    SmartCocoonSensorEntityDescription(
+        key="update_duration",
+        name="Refresh Duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=last_update_duration,
+    ),
+    SmartCocoonSensorEntityDescription(
+        key="last_update_success",
+        name="Last Successful Refresh",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=last_update_success,
+    ),
+    SmartCocoonSensorEntityDescription(
+        key="requests",
+        name="Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:swap-vertical",
+        value_fn=lambda api, coordinators: api.stats.requests,
+    ),
+    SmartCocoonSensorEntityDescription(
+        key="errors",
+        name="Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:alert-circle",
+        value_fn=lambda api, coordinators: api.stats.errors,
+    ),
+    SmartCocoonSensorEntityDescription(
+        key="bytes",
+        name="Data Received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        value_fn=lambda api, coordinators: api.stats.bytes,
+    ),
+]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up a SmartCocoon sensor entity based on a config entry."""
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities(
+        SmartCocoonSensorEntity(
+            api=entry[DATA_API],
+            coordinators=entry[DATA_COORDINATORS],
+            config_entry=config_entry,
+            entity_description=description,
+        )
+        for description in SENSOR_DESCRIPTIONS
+    )
+
+
+class SmartCocoonSensorEntity(SensorEntity):
+    """Representation of a SmartCocoon diagnostic sensor entity."""
+
+    entity_description: SmartCocoonSensorEntityDescription
+    # Statistics change on every request, idle polls do not notify listeners
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        api: SmartCocoonAPI,
+        coordinators: dict[int, SmartCocoonCoordinator],
+        config_entry: ConfigEntry,
+        entity_description: SmartCocoonSensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        self.api = api
+        self.coordinators = coordinators
+        self.entity_description = entity_description
+        self._attr_device_info = entry_device_info(config_entry)
+        self._attr_name = f"SmartCocoon {entity_description.name}"
+        self._attr_unique_id = f"{config_entry.entry_id}-{entity_description.key}"
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the value reported by the sensor."""
+        return self.entity_description.value_fn(self.api, self.coordinators.values())
+
+    async def async_update(self) -> None:
+        """Update the entity, statistics are read when the state is written."""
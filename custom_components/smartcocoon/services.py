@@ -0,0 +1,147 @@
+"""Services for the SmartCocoon integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .api.const import FanMode
+from .const import (
+    ATTR_MODE,
+    ATTR_SPEED_LEVEL,
+    DATA_COORDINATORS,
+    DOMAIN,
+    SERVICE_SET_FANS,
+)
+from .coordinator import SmartCocoonCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SET_FANS_SCHEMA = vol.All(
+    cv.make_entity_service_schema(
+        {
+            vol.Optional(ATTR_MODE): vol.In([mode.value for mode in FanMode]),
+            vol.Optional(ATTR_SPEED_LEVEL): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=12)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_MODE, ATTR_SPEED_LEVEL),
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the SmartCocoon services."""
+
+    async def async_set_fans(call: ServiceCall) -> ServiceResponse:
+        """Write the same fan properties to all targeted fans as one batch."""
+        data = {
+            key: call.data[key]
+            for key in (ATTR_MODE, ATTR_SPEED_LEVEL)
+            if key in call.data
+        }
+        fan_ids = async_extract_fan_ids(hass, call)
+        if not fan_ids:
+            raise HomeAssistantError("No SmartCocoon fans targeted")
+
+        batches: dict[SmartCocoonCoordinator, list[int]] = {}
+        results: dict[str, dict[str, Any]] = {}
+        for fan_id in sorted(fan_ids):
+            if (coordinator := async_get_coordinator(hass, fan_id)) is None:
+                results[str(fan_id)] = {"success": False, "error": "Fan not loaded"}
+                continue
+            batches.setdefault(coordinator, []).append(fan_id)
+
+        _LOGGER.debug("Writing fans: %s with data: %s", list(batches.values()), data)
+        batch_errors = await asyncio.gather(
+            *(
+                coordinator.async_set_fans(batch, data)
+                for coordinator, batch in batches.items()
+            )
+        )
+        for coordinator, errors in zip(batches, batch_errors, strict=True):
+            for fan_id, error in errors.items():
+                result: dict[str, Any] = {"success": error is None}
+                if coordinator.data and (fan := coordinator.data.fans.get(fan_id)):
+                    result["name"] = fan.name
+                if error is not None:
+                    result["error"] = str(error)
+                results[str(fan_id)] = result
+
+        if not call.return_response and (
+            failed := [
+                f"{result.get('name', fan_id)} ({result['error']})"
+                for fan_id, result in results.items()
+                if not result["success"]
+            ]
+        ):
+            raise HomeAssistantError(
+                f"Failed to write {len(failed)} of {len(results)} fans: "
+                + ", ".join(failed)
+            )
+        return {"fans": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_FANS,
+        async_set_fans,
+        schema=SET_FANS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_extract_fan_ids(hass: HomeAssistant, call: ServiceCall) -> set[int]:
+    """Return the IDs of the fans of the targeted devices and entities."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    selected = async_extract_referenced_entity_ids(hass, call)
+    device_ids = set(selected.referenced_devices)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        if (entity_entry := entity_registry.async_get(entity_id)) and (
+            entity_entry.platform == DOMAIN and entity_entry.device_id
+        ):
+            device_ids.add(entity_entry.device_id)
+    fan_ids: set[int] = set()
+    for device_id in device_ids:
+        if not (device_entry := device_registry.async_get(device_id)):
+            continue
+        fan_ids.update(
+            int(identifier)
+            for domain, identifier in device_entry.identifiers
+            if domain == DOMAIN and identifier.isdigit()
+        )
+    return fan_ids
+
+
+@callback
+def async_get_coordinator(
+    hass: HomeAssistant, fan_id: int
+) -> SmartCocoonCoordinator | None:
+    """Return the coordinator holding a fan, of any config entry."""
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        if (entry := hass.data.get(DOMAIN, {}).get(config_entry.entry_id)) is None:
+            continue
+        for coordinator in entry[DATA_COORDINATORS].values():
+            if coordinator.data and fan_id in coordinator.data.fans:
+                return coordinator
+    return None
@@ -0,0 +1,166 @@
+"""Offline benchmarks for the SmartCocoon API client.
+
+Runs against the fake cloud in scripts/fake_cloud.py, so refresh latency and
+CPU per poll can be compared between revisions without the real cloud. JSON
+decoding and encoding are compared between the available codecs.
+
+    python scripts/benchmark.py --systems 10 --rooms 6 --fans 3 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+import statistics
+import sys
+import time
+
+from fake_cloud import add_arguments, from_arguments
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "custom_components/smartcocoon"))
+
+from api import SmartCocoonAPI  # noqa: E402
+from api.codec import JsonCodec, OrjsonCodec, orjson  # noqa: E402
+from api.data import Data  # noqa: E402
+from api.system import System  # noqa: E402
+
+
+def report(name: str, samples: list[float]) -> None:
+    """Print wall time statistics in milliseconds."""
+    samples = sorted(sample * 1000 for sample in samples)
+    print(
+        f"{name:<24} mean {statistics.mean(samples):9.3f} ms"
+        f"  median {statistics.median(samples):9.3f} ms"
+        f"  p95 {samples[int(len(samples) * 0.95) - 1]:9.3f} ms"
+    )
+
+
+async def measure(
+    function: Callable[[], Awaitable[object]], iterations: int
+) -> tuple[list[float], list[float], int]:
+    """Return wall times, CPU times and error count of an awaitable factory."""
+    wall, cpu, errors = [], [], 0
+    for _ in range(iterations):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            await function()
+        except Exception:  # noqa: BLE001
+            errors += 1
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return wall, cpu, errors
+
+
+async def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    cloud = from_arguments(args)
+    api = SmartCocoonAPI(authorization="fake", api_prefix=await cloud.start())
+    try:
+        print(
+            f"{len(cloud.systems)} systems, {len(cloud.fans)} fans,"
+            f" {args.iterations} iterations"
+        )
+        system_ids = [system["id"] for system in cloud.systems]
+
+        # Each system is polled by its own coordinator
+        async def update_system() -> None:
+            for system_id in system_ids:
+                await api.update(target_systems=[system_id])
+
+        api.bulk_rooms = False
+        wall, cpu, errors = await measure(update_system, args.iterations)
+        polls = args.iterations * len(system_ids)
+        report(
+            "update per system (wall)", [sample / len(system_ids) for sample in wall]
+        )
+        report("update per system (cpu)", [sample / len(system_ids) for sample in cpu])
+        print(
+            f"{'requests per update':<24} "
+            f"{sum(cloud.requests.values()) / polls:9.1f}"
+            f"  errors {errors}  cache hits {api.cache_hits}"
+        )
+
+        if cloud.bulk_rooms and len(system_ids) > 1:
+            # With bulk rooms support, one poll also updates the sibling systems
+            async def update_bulk() -> None:
+                await api.update(
+                    target_systems=system_ids[:1], sibling_systems=system_ids
+                )
+
+            api.bulk_rooms = None
+            cloud.requests.clear()
+            wall, cpu, errors = await measure(update_bulk, args.iterations)
+            report("update with siblings (wall)", wall)
+            report("update with siblings (cpu)", cpu)
+            print(
+                f"{'requests per update':<24} "
+                f"{sum(cloud.requests.values()) / args.iterations:9.1f}"
+                f"  errors {errors}"
+            )
+
+        rooms = {
+            system["id"]: system_rooms
+            for system in cloud.systems
+            if (system_rooms := cloud.rooms.get(system["id"]))
+        }
+
+        async def build() -> Data:
+            return Data(
+                [
+                    System(api, {**system, "rooms": rooms[system["id"]]})
+                    for system in cloud.systems
+                    if system["id"] in rooms
+                ]
+            )
+
+        wall, _, _ = await measure(build, args.iterations)
+        report("model build", wall)
+
+        previous, data = await build(), await build()
+
+        async def diff() -> None:
+            data.diff(previous)
+
+        wall, _, _ = await measure(diff, args.iterations)
+        report("diff", wall)
+
+        async def resolve() -> None:
+            for fan_id in data.fans:
+                fan = data.fans[fan_id]
+                (fan.connected, fan.name, fan.fan_id, fan.fan_on, fan.mode)
+
+        wall, _, _ = await measure(resolve, args.iterations)
+        report("entity resolution", wall)
+
+        payload = {
+            "client_systems": cloud.systems,
+            "rooms": [room for rooms in cloud.rooms.values() for room in rooms],
+        }
+        codecs = [JsonCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+        for codec in codecs:
+            encoded = codec.dumps(payload)
+
+            async def decode(codec=codec, encoded=encoded) -> None:
+                codec.loads(encoded)
+
+            async def encode(codec=codec) -> None:
+                codec.dumps(payload)
+
+            wall, _, _ = await measure(decode, args.iterations)
+            report(f"decode ({codec.name}, {len(encoded)} B)", wall)
+            wall, _, _ = await measure(encode, args.iterations)
+            report(f"encode ({codec.name})", wall)
+    finally:
+        await api.close()
+        await cloud.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
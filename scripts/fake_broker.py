@@ -0,0 +1,289 @@
+"""Minimal stand-in for the SmartCocoon MQTT broker.
+
+Speaks just enough MQTT 3.1.1 for the push transport: connect with optional
+credentials, subscribe, unsubscribe, ping and QoS 0 publish. Fan states of
+the fake cloud's synthetic fans can be published periodically, or states
+published by tests.
+
+    python scripts/fake_broker.py --systems 2 --interval 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+
+from fake_cloud import add_arguments, from_arguments
+
+CONNECT, CONNACK = 1, 2
+PUBLISH = 3
+SUBSCRIBE, SUBACK = 8, 9
+UNSUBSCRIBE, UNSUBACK = 10, 11
+PINGREQ, PINGRESP = 12, 13
+DISCONNECT = 14
+
+CONNACK_ACCEPTED = 0
+CONNACK_NOT_AUTHORIZED = 5
+
+STATE_TOPIC = "{mqtt_username}/{fan_id}/state"
+
+
+def matches(pattern: str, topic: str) -> bool:
+    """Return True if a topic matches a subscription pattern."""
+    pattern_levels = pattern.split("/")
+    topic_levels = topic.split("/")
+    for index, level in enumerate(pattern_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels) or level not in ("+", topic_levels[index]):
+            return False
+    return len(pattern_levels) == len(topic_levels)
+
+
+def packet(packet_type: int, body: bytes = b"", flags: int = 0) -> bytes:
+    """Encode a packet with its remaining length."""
+    header = bytearray([packet_type << 4 | flags])
+    length = len(body)
+    while True:
+        length, digit = divmod(length, 128)
+        header.append(digit | (128 if length else 0))
+        if not length:
+            return bytes(header) + body
+
+
+def string(value: str | bytes) -> bytes:
+    """Encode a length prefixed string."""
+    if isinstance(value, str):
+        value = value.encode()
+    return struct.pack("!H", len(value)) + value
+
+
+class Reader:
+    """Reader of the fields of a packet body."""
+
+    def __init__(self, body: bytes) -> None:
+        """Initialize."""
+        self.body = body
+        self.offset = 0
+
+    def short(self) -> int:
+        """Read a two byte integer."""
+        (value,) = struct.unpack_from("!H", self.body, self.offset)
+        self.offset += 2
+        return value
+
+    def byte(self) -> int:
+        """Read a byte."""
+        self.offset += 1
+        return self.body[self.offset - 1]
+
+    def bytes(self) -> bytes:
+        """Read length prefixed bytes."""
+        length = self.short()
+        self.offset += length
+        return self.body[self.offset - length : self.offset]
+
+    def string(self) -> str:
+        """Read a length prefixed string."""
+        return self.bytes().decode()
+
+    def rest(self) -> bytes:
+        """Read the remaining bytes."""
+        return self.body[self.offset :]
+
+    def more(self) -> bool:
+        """Return True if bytes remain."""
+        return self.offset < len(self.body)
+
+
+class Session:
+    """Connection of a client and its subscriptions."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        """Initialize."""
+        self.subscriptions: set[str] = set()
+        self.username: str | None = None
+        self.writer = writer
+
+    def send(self, data: bytes) -> None:
+        """Send a packet."""
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class FakeBroker:
+    """Fake MQTT broker forwarding QoS 0 messages to subscribers."""
+
+    def __init__(self, credentials: dict[str, str] | None = None) -> None:
+        """Initialize, only accepting the given credentials if any."""
+        self.credentials = credentials
+        self.connections = 0
+        self.rejected = 0
+        self.sessions: set[Session] = set()
+        self.server: asyncio.Server | None = None
+        self.subscribed = asyncio.Condition()
+        self.port: int | None = None
+
+    @property
+    def subscriptions(self) -> set[str]:
+        """Return the subscribed topic patterns of all sessions."""
+        return {
+            pattern for session in self.sessions for pattern in session.subscriptions
+        }
+
+    async def wait_subscribed(self, topic: str) -> None:
+        """Wait until a session subscribes to a topic."""
+        async with self.subscribed:
+            await self.subscribed.wait_for(
+                lambda: any(matches(pattern, topic) for pattern in self.subscriptions)
+            )
+
+    def publish(self, topic: str, payload: bytes | str) -> int:
+        """Publish a message, returning the number of receiving sessions."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        data = packet(PUBLISH, string(topic) + payload)
+        sessions = [
+            session
+            for session in self.sessions
+            if any(matches(pattern, topic) for pattern in session.subscriptions)
+        ]
+        for session in sessions:
+            session.send(data)
+        return len(sessions)
+
+    async def read_packet(self, reader: asyncio.StreamReader) -> tuple[int, int, bytes]:
+        """Read a packet, returning its type, flags and body."""
+        first = (await reader.readexactly(1))[0]
+        length, multiplier = 0, 1
+        while True:
+            digit = (await reader.readexactly(1))[0]
+            length += (digit & 127) * multiplier
+            multiplier *= 128
+            if not digit & 128:
+                break
+        return first >> 4, first & 15, await reader.readexactly(length)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a client connection."""
+        session = Session(writer)
+        try:
+            packet_type, _, body = await self.read_packet(reader)
+            if packet_type != CONNECT or not self.connect(session, Reader(body)):
+                return
+            self.sessions.add(session)
+            while True:
+                packet_type, flags, body = await self.read_packet(reader)
+                if packet_type == DISCONNECT:
+                    return
+                await self.dispatch(session, packet_type, flags, Reader(body))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def connect(self, session: Session, reader: Reader) -> bool:
+        """Accept or reject a connection."""
+        reader.string()  # Protocol name
+        reader.byte()  # Protocol level
+        flags = reader.byte()
+        reader.short()  # Keep alive
+        reader.string()  # Client ID
+        if flags & 4:
+            reader.string()  # Will topic
+            reader.bytes()  # Will message
+        session.username = reader.string() if flags & 128 else None
+        password = reader.string() if flags & 64 else None
+        if self.credentials is not None and (
+            session.username not in self.credentials
+            or self.credentials[session.username] != password
+        ):
+            self.rejected += 1
+            session.send(packet(CONNACK, bytes([0, CONNACK_NOT_AUTHORIZED])))
+            return False
+        self.connections += 1
+        session.send(packet(CONNACK, bytes([0, CONNACK_ACCEPTED])))
+        return True
+
+    async def dispatch(
+        self, session: Session, packet_type: int, flags: int, reader: Reader
+    ) -> None:
+        """Handle a packet of a connected session."""
+        if packet_type == PUBLISH:
+            topic = reader.string()
+            if flags & 6:
+                reader.short()  # Packet ID, QoS above 0 is delivered as 0
+            self.publish(topic, reader.rest())
+        elif packet_type == SUBSCRIBE:
+            packet_id = reader.short()
+            granted = bytearray()
+            while reader.more():
+                session.subscriptions.add(reader.string())
+                reader.byte()  # Requested QoS
+                granted.append(0)
+            session.send(packet(SUBACK, struct.pack("!H", packet_id) + granted))
+            async with self.subscribed:
+                self.subscribed.notify_all()
+        elif packet_type == UNSUBSCRIBE:
+            packet_id = reader.short()
+            while reader.more():
+                session.subscriptions.discard(reader.string())
+            session.send(packet(UNSUBACK, struct.pack("!H", packet_id)))
+        elif packet_type == PINGREQ:
+            session.send(packet(PINGRESP))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving and return the port."""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop serving and close all connections."""
+        if self.server is not None:
+            self.server.close()
+            for session in list(self.sessions):
+                session.writer.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+async def main() -> None:
+    """Serve until interrupted, publishing fan states periodically."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument(
+        "--interval", type=float, default=10.0, help="seconds between states"
+    )
+    args = parser.parse_args()
+    cloud = from_arguments(args)
+    broker = FakeBroker(
+        {fan["mqtt_username"]: fan["mqtt_password"] for fan in cloud.fans.values()}
+    )
+    port = await broker.start(args.host, args.port)
+    print(f"Serving {len(cloud.fans)} fans at mqtt://{args.host}:{port}")
+    try:
+        while True:
+            await asyncio.sleep(args.interval)
+            fan = random.choice(list(cloud.fans.values()))
+            fan["speed_level"] = random.randint(1, 12)
+            broker.publish(
+                STATE_TOPIC.format(
+                    mqtt_username=fan["mqtt_username"], fan_id=fan["fan_id"]
+                ),
+                json.dumps({"speed_level": fan["speed_level"]}),
+            )
+    finally:
+        await broker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
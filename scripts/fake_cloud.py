@@ -0,0 +1,284 @@
+"""Record/replay stand-in for the SmartCocoon cloud API.
+
+Serves ``client_systems``, ``rooms`` and ``fans/{id}`` from either captured
+responses (as saved with the "save server responses" option) or synthetic
+data, with configurable latency, error and 403 rates and optional ETags.
+Failures can also be queued for exact requests, e.g. by tests.
+
+    python scripts/fake_cloud.py --systems 5 --rooms 4 --fans 3
+    python scripts/fake_cloud.py --capture /config/custom_components/smartcocoon/api/responses
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import random
+import re
+from typing import Any
+
+from aiohttp import web
+
+API_PATH = "/api"
+
+
+class FakeCloud:
+    """Fake SmartCocoon cloud serving systems, rooms and fans."""
+
+    def __init__(
+        self,
+        systems: list[dict[str, Any]],
+        rooms: dict[int, list[dict[str, Any]]],
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        forbidden_rate: float = 0.0,
+        seed: int | None = None,
+        etags: bool = False,
+        bulk_rooms: bool = True,
+    ) -> None:
+        """Initialize."""
+        self.bulk_rooms = bulk_rooms
+        self.etags = etags
+        self.systems = systems
+        self.rooms = rooms
+        self.fans = {
+            fan["id"]: fan
+            for system_rooms in rooms.values()
+            for room in system_rooms
+            for fan in room.get("fans", [])
+        }
+        self.latency = latency
+        self.error_rate = error_rate
+        self.failures: list[tuple[str | None, int, dict[str, str]]] = []
+        self.forbidden_rate = forbidden_rate
+        self.random = random.Random(seed)
+        self.requests: dict[str, int] = {}
+        self.runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    @classmethod
+    def synthetic(cls, systems: int, rooms: int, fans: int, **kwargs: Any) -> FakeCloud:
+        """Generate systems x rooms x fans of synthetic data."""
+        system_data = []
+        room_data: dict[int, list[dict[str, Any]]] = {}
+        for system_index in range(systems):
+            system_id = system_index + 1
+            system_data.append(
+                {
+                    "id": system_id,
+                    "name": f"System {system_id}",
+                    "user_id": 1,
+                    "location": {
+                        "id": system_id,
+                        "city": "City",
+                        "state": "ST",
+                        "postal_code": "00000",
+                    },
+                }
+            )
+            room_data[system_id] = []
+            for room_index in range(rooms):
+                room_id = system_id * 1000 + room_index
+                room_data[system_id].append(
+                    {
+                        "id": room_id,
+                        "name": f"Room {room_id}",
+                        "client_system_id": system_id,
+                        "fans": [
+                            {
+                                "id": room_id * 100 + fan_index,
+                                "fan_id": f"SC{room_id * 100 + fan_index:08d}",
+                                "name": f"Fan {room_id * 100 + fan_index}",
+                                "room_id": room_id,
+                                "mode": "auto",
+                                "fan_on": bool(fan_index % 2),
+                                "speed_level": fan_index % 12 + 1,
+                                "power": 0,
+                                "size": 4,
+                                "connected": True,
+                                "firmware_version": "1.0.0",
+                                "mqtt_username": f"user{room_id * 100 + fan_index}",
+                                "mqtt_password": "password",
+                            }
+                            for fan_index in range(fans)
+                        ],
+                    }
+                )
+        return cls(system_data, room_data, **kwargs)
+
+    @classmethod
+    def from_capture(cls, location: str, **kwargs: Any) -> FakeCloud:
+        """Replay the latest captured client_systems and rooms responses."""
+        latest: dict[str, Path] = {}
+        for file in sorted(Path(location).glob("*.json*")):
+            key = re.sub(r"_\d{8}T\d{6}\d*Z$", "", file.name.split(".")[0])
+            latest[key] = file
+        systems = cls.load(latest["client_systems"])["client_systems"]
+        rooms = {
+            system["id"]: cls.load(file)["rooms"]
+            for system in systems
+            if (file := latest.get(f"rooms_{system['id']}"))
+        }
+        return cls(systems, rooms, **kwargs)
+
+    @staticmethod
+    def load(file: Path) -> Any:
+        """Load a captured JSON or gzipped JSON file."""
+        if file.suffix == ".gz":
+            with gzip.open(file) as gzip_file:
+                return json.load(gzip_file)
+        return json.loads(file.read_text())
+
+    def fail(
+        self,
+        status: int,
+        count: int = 1,
+        path: str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Fail the next requests, optionally only those to a path, with a status."""
+        self.failures.extend([(path, status, headers or {})] * count)
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count requests and inject latency and failures."""
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for index, (path, status, headers) in enumerate(self.failures):
+            if path is None or request.path == f"{API_PATH}/{path}":
+                del self.failures[index]
+                return web.Response(status=status, headers=headers)
+        if self.random.random() < self.forbidden_rate:
+            return web.Response(status=403)
+        if self.random.random() < self.error_rate:
+            return web.Response(status=503)
+        return await handler(request)
+
+    async def sign_in(self, request: web.Request) -> web.Response:
+        """Handle auth/sign_in."""
+        return web.json_response(
+            {"data": {"id": 1}}, headers={"authorization": "Bearer fake"}
+        )
+
+    def json_response(self, request: web.Request, data: Any) -> web.Response:
+        """Return a JSON response, or 304 if the ETag matches when enabled."""
+        body = json.dumps(data).encode()
+        if not self.etags:
+            return web.Response(body=body, content_type="application/json")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def client_systems(self, request: web.Request) -> web.Response:
+        """Handle client_systems."""
+        return self.json_response(request, {"client_systems": self.systems})
+
+    async def get_rooms(self, request: web.Request) -> web.Response:
+        """Handle rooms, optionally filtered by client system ID."""
+        for key, value in request.query.items():
+            if "client_system_id" in key:
+                return self.json_response(
+                    request, {"rooms": self.rooms.get(int(value), [])}
+                )
+        if not self.bulk_rooms:
+            return web.Response(status=400)
+        return self.json_response(
+            request,
+            {"rooms": [room for rooms in self.rooms.values() for room in rooms]},
+        )
+
+    async def put_fan(self, request: web.Request) -> web.Response:
+        """Handle fans/{id}."""
+        if (fan := self.fans.get(int(request.match_info["id"]))) is None:
+            return web.Response(status=404)
+        fan.update(await request.json())
+        if fan["mode"] in ("always_on", "always_off"):
+            fan["fan_on"] = fan["mode"] == "always_on"
+        return web.json_response({"fan": fan})
+
+    def application(self) -> web.Application:
+        """Return the application."""
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_post(f"{API_PATH}/auth/sign_in", self.sign_in)
+        app.router.add_get(f"{API_PATH}/client_systems", self.client_systems)
+        app.router.add_get(f"{API_PATH}/rooms", self.get_rooms)
+        app.router.add_put(f"{API_PATH}/fans/{{id}}", self.put_fan)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the API prefix URL."""
+        self.runner = web.AppRunner(self.application(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://{host}:{port}{API_PATH}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add fake cloud arguments to a parser."""
+    parser.add_argument("--capture", help="replay captured responses from here")
+    parser.add_argument("--systems", type=int, default=1)
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--fans", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--etags", action="store_true", help="send ETags and 304s")
+    parser.add_argument(
+        "--no-bulk-rooms",
+        action="store_false",
+        dest="bulk_rooms",
+        help="reject rooms requests without a client system filter",
+    )
+
+
+def from_arguments(args: argparse.Namespace) -> FakeCloud:
+    """Create a fake cloud from parsed arguments."""
+    kwargs = {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "forbidden_rate": args.forbidden_rate,
+        "seed": args.seed,
+        "etags": args.etags,
+        "bulk_rooms": args.bulk_rooms,
+    }
+    if args.capture:
+        return FakeCloud.from_capture(args.capture, **kwargs)
+    return FakeCloud.synthetic(args.systems, args.rooms, args.fans, **kwargs)
+
+
+async def main() -> None:
+    """Serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    cloud = from_arguments(args)
+    url = await cloud.start(args.host, args.port)
+    print(f"Serving {len(cloud.systems)} systems and {len(cloud.fans)} fans at {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
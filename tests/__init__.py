@@ -0,0 +1,32 @@
+"""Tests for the SmartCocoon integration."""
+
+from __future__ import annotations
+
+from functools import partial
+from unittest.mock import patch
+
+from fake_cloud import FakeCloud
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.api.limiter import RateLimiter
+
+
+async def setup_integration(
+    hass: HomeAssistant, config_entry: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Set up a config entry against the fake cloud, without rate limiting."""
+    with (
+        patch(
+            "custom_components.smartcocoon.SmartCocoonAPI",
+            partial(SmartCocoonAPI, api_prefix=cloud.url, write_window=0),
+        ),
+        patch(
+            "custom_components.smartcocoon.RateLimiter",
+            partial(RateLimiter, rate=1000),
+        ),
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
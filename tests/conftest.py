@@ -0,0 +1,82 @@
+"""Fixtures for SmartCocoon tests, served by the fake cloud in scripts."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from unittest.mock import patch
+
+from fake_cloud import FakeCloud
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.const import (
+    CONF_AUTHORIZATION,
+    CONF_AUTO_INCLUDE_FANS,
+    CONF_FANS,
+    CONF_SYSTEMS,
+    DOMAIN,
+)
+
+from . import setup_integration
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    """Retry transient failures without waiting."""
+    with patch("custom_components.smartcocoon.api.backoff", return_value=0):
+        yield
+
+
+@pytest.fixture
+async def cloud(
+    request: pytest.FixtureRequest, socket_enabled: None
+) -> AsyncGenerator[FakeCloud]:
+    """Serve systems x rooms x fans on the loopback, by default two of each."""
+    cloud = FakeCloud.synthetic(*getattr(request, "param", (2, 2, 2)))
+    await cloud.start()
+    yield cloud
+    await cloud.stop()
+
+
+@pytest.fixture
+async def api(cloud: FakeCloud) -> AsyncGenerator[SmartCocoonAPI]:
+    """Return an API client of the fake cloud."""
+    api = SmartCocoonAPI(
+        authorization="Bearer fake", api_prefix=cloud.url, write_window=0
+    )
+    yield api
+    await api.close()
+
+
+@pytest.fixture
+def config_entry(
+    hass: HomeAssistant, enable_custom_integrations: None, cloud: FakeCloud
+) -> MockConfigEntry:
+    """Return a config entry including all fans of the fake cloud."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="user@example.com",
+        data={
+            CONF_AUTHORIZATION: "Bearer fake",
+            CONF_AUTO_INCLUDE_FANS: True,
+            CONF_EMAIL: "user@example.com",
+            CONF_FANS: [],
+            CONF_PASSWORD: "password",
+            CONF_SYSTEMS: [system["id"] for system in cloud.systems],
+        },
+    )
+    config_entry.add_to_hass(hass)
+    return config_entry
+
+
+@pytest.fixture(name="setup_integration")
+async def setup_integration_fixture(
+    hass: HomeAssistant, config_entry: MockConfigEntry, cloud: FakeCloud
+) -> MockConfigEntry:
+    """Set up the config entry against the fake cloud."""
+    await setup_integration(hass, config_entry, cloud)
+    return config_entry
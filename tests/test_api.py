@@ -0,0 +1,344 @@
+"""Tests for the SmartCocoon API client."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+import time
+from unittest.mock import Mock
+
+import aiohttp
+from fake_cloud import FakeCloud
+import pytest
+
+from custom_components.smartcocoon.api import SmartCocoonAPI, SmartCocoonAuthError
+from custom_components.smartcocoon.api.const import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    RETRY_ATTEMPTS,
+)
+from custom_components.smartcocoon.api.limiter import RateLimiter
+from custom_components.smartcocoon.api.retry import (
+    CircuitBreaker,
+    SmartCocoonCircuitOpenError,
+    retry_after,
+)
+
+
+def response_error(status: int, headers: dict[str, str] | None = None):
+    """Return a client response error."""
+    return aiohttp.ClientResponseError(
+        request_info=Mock(), history=(), status=status, headers=headers
+    )
+
+
+async def test_update(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test all systems are updated with a single bulk rooms request."""
+    data = await api.update()
+
+    assert data.systems.keys() == {1, 2}
+    assert data.fans.keys() == cloud.fans.keys()
+    assert data.fans[100101].room is data.rooms[1001]
+    assert data.fans[100101].system is data.systems[1]
+    assert cloud.requests["/api/rooms"] == 1
+    assert api.bulk_rooms is True
+
+
+async def test_update_without_bulk_rooms(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test systems are requested one by one if bulk requests are rejected."""
+    cloud.bulk_rooms = False
+
+    data = await api.update(target_systems=[1], sibling_systems=[1, 2])
+
+    assert data.systems.keys() == {1}
+    assert api.bulk_rooms is False
+    assert cloud.requests["/api/rooms"] == 2
+
+
+async def test_update_with_siblings(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test sibling systems ride along on a bulk request only."""
+    data = await api.update(target_systems=[1], sibling_systems=[1, 2])
+
+    assert data.systems.keys() == {1, 2}
+    assert cloud.requests["/api/rooms"] == 1
+
+    api.bulk_rooms = False
+    data = await api.update(target_systems=[1], sibling_systems=[1, 2])
+
+    assert data.systems.keys() == {1}
+    assert cloud.requests["/api/rooms"] == 2
+
+
+async def test_models_reused(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test unchanged systems keep their models across per-system polls."""
+    api.bulk_rooms = False
+    first = await api.update(target_systems=[1])
+    await api.update(target_systems=[2])
+    second = await api.update(target_systems=[1])
+
+    assert api.models.keys() == {1, 2}
+    assert second.systems[1] is first.systems[1]
+    assert api.cache_hits == 3
+
+    cloud.fans[100000]["speed_level"] = 9
+    third = await api.update(target_systems=[1])
+
+    assert third.systems[1] is not first.systems[1]
+    assert third.fans[100000].speed_level == 9
+
+
+async def test_models_evicted(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test models are evicted once their system is gone from the account."""
+    await api.update()
+    cloud.systems.pop()
+    api.client_systems_result = None
+
+    await api.update()
+
+    assert api.models.keys() == {1}
+
+
+async def test_update_without_caching(api: SmartCocoonAPI) -> None:
+    """Test models can be built without touching the cached ones."""
+    first = await api.update()
+    second = await api.update(cache_models=False)
+
+    assert second.systems[1] is not first.systems[1]
+    assert api.models[1][3] is first.systems[1]
+
+
+async def test_conditional_requests(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test cached results are returned on 304 responses."""
+    cloud.etags = True
+    first = await api.update()
+    second = await api.update()
+
+    assert api.cache_hits == 2
+    assert second.systems[1] is first.systems[1]
+
+
+async def test_retry_transient(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test transient GET failures are retried."""
+    cloud.fail(503, count=RETRY_ATTEMPTS - 1, path="rooms")
+
+    data = await api.update()
+
+    assert data.fans.keys() == cloud.fans.keys()
+    assert api.retries == RETRY_ATTEMPTS - 1
+    assert api.breaker.failures == 0
+
+
+async def test_retry_exhausted(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test failures are raised once the retries are exhausted."""
+    cloud.fail(503, count=RETRY_ATTEMPTS, path="rooms")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.update()
+
+    assert cloud.requests["/api/rooms"] == RETRY_ATTEMPTS
+    assert api.breaker.failures == 1
+
+
+async def test_retry_deadline(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test no retry starts after the deadline."""
+    await api.client_systems()
+    cloud.fail(503, count=RETRY_ATTEMPTS, path="rooms")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.update(deadline=time.monotonic())
+
+    assert cloud.requests["/api/rooms"] == 1
+
+
+async def test_retry_not_permanent(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test permanent failures are raised without retrying."""
+    cloud.fail(404, path="rooms")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.update(target_systems=[1])
+
+    assert cloud.requests["/api/rooms"] == 1
+    assert api.breaker.failures == 0
+
+
+async def test_retry_after(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test a requested delay is honoured and throttles the limiter."""
+    api.limiter = Mock()
+    api.limiter.acquire = Mock(side_effect=lambda priority: asyncio.sleep(0))
+    cloud.fail(429, path="rooms", headers={"Retry-After": "0"})
+
+    await api.update()
+
+    assert api.retries == 1
+    api.limiter.throttle.assert_called_once_with(0)
+
+
+def test_retry_after_header() -> None:
+    """Test parsing Retry-After headers."""
+    date = datetime.now(UTC) + timedelta(seconds=60)
+
+    assert retry_after(response_error(429, {"Retry-After": "5"})) == 5
+    assert 55 < retry_after(response_error(503, {"Retry-After": format_datetime(date)}))
+    assert retry_after(response_error(503, {"Retry-After": "soon"})) is None
+    assert retry_after(response_error(500, {"Retry-After": "5"})) is None
+    assert retry_after(response_error(429)) is None
+
+
+async def test_writes_not_retried(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test writes fail without retrying and count towards the system breaker."""
+    cloud.fail(503, path="fans/100000")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.write(100000, {"mode": "always_on"}, system_id=1)
+
+    assert cloud.requests["/api/fans/100000"] == 1
+    assert api.system_breaker(1).failures == 1
+    assert api.breaker.failures == 0
+
+
+async def test_breaker_per_system(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test a failing system opens its own breaker only."""
+    api.bulk_rooms = False
+    cloud.fail(503, count=CIRCUIT_BREAKER_THRESHOLD * RETRY_ATTEMPTS, path="rooms")
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await api.update(target_systems=[1])
+
+    with pytest.raises(SmartCocoonCircuitOpenError):
+        await api.update(target_systems=[1])
+
+    assert cloud.requests["/api/rooms"] == CIRCUIT_BREAKER_THRESHOLD * RETRY_ATTEMPTS
+    assert api.system_breaker(1).state == "open"
+    assert api.breaker.state == "closed"
+    assert (await api.update(target_systems=[2])).systems.keys() == {2}
+
+
+def test_breaker() -> None:
+    """Test the breaker opens, lets a request through and closes again."""
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(SmartCocoonCircuitOpenError):
+        breaker.check()
+
+    breaker.opened -= 60
+    assert breaker.state == "half_open"
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 1
+
+    breaker.opened -= 60
+    breaker.record_success()
+    assert breaker.as_dict() == {"failures": 0, "state": "closed", "trips": 1}
+
+
+async def test_relogin(cloud: FakeCloud) -> None:
+    """Test a rejected authorization logs in again once and retries."""
+    authorizations = []
+    api = SmartCocoonAPI(
+        authorization="Bearer stale",
+        api_prefix=cloud.url,
+        email="user@example.com",
+        password="password",
+        authorization_callback=authorizations.append,
+        bulk_rooms=False,
+    )
+    cloud.fail(403, count=2, path="rooms")
+    try:
+        data = await api.update()
+    finally:
+        await api.close()
+
+    assert data.systems.keys() == {1, 2}
+    assert cloud.requests["/api/auth/sign_in"] == 1
+    assert authorizations == ["Bearer fake"]
+    assert api.authorization == "Bearer fake"
+
+
+async def test_relogin_shared(cloud: FakeCloud) -> None:
+    """Test concurrently rejected requests share a single login."""
+    authorizations = []
+    api = SmartCocoonAPI(
+        authorization="Bearer stale",
+        api_prefix=cloud.url,
+        email="user@example.com",
+        password="password",
+        authorization_callback=authorizations.append,
+        bulk_rooms=False,
+    )
+    await api.client_systems()
+    cloud.latency = 0.01
+    cloud.fail(403, count=2, path="rooms")
+    try:
+        data = await api.update()
+    finally:
+        await api.close()
+
+    assert data.systems.keys() == {1, 2}
+    assert cloud.requests["/api/rooms"] == 4
+    assert cloud.requests["/api/auth/sign_in"] == 1
+    assert authorizations == ["Bearer fake"]
+
+
+async def test_relogin_without_password(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test a rejected authorization is raised without stored credentials."""
+    cloud.fail(403, path="client_systems")
+
+    with pytest.raises(SmartCocoonAuthError):
+        await api.update()
+
+    assert "/api/auth/sign_in" not in cloud.requests
+    assert api.breaker.failures == 0
+
+
+async def test_write_coalescing(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test writes to a fan within the window are sent as one request."""
+    api.write_window = 0.05
+
+    results = await asyncio.gather(
+        api.write(100000, {"mode": "always_on"}),
+        api.write(100000, {"speed_level": 5}),
+        api.write(100001, {"speed_level": 6}),
+    )
+
+    assert results[0] == results[1]
+    assert results[0]["fan"]["mode"] == "always_on"
+    assert results[0]["fan"]["speed_level"] == 5
+    assert results[2]["fan"]["speed_level"] == 6
+    assert cloud.requests["/api/fans/100000"] == 1
+    assert cloud.requests["/api/fans/100001"] == 1
+    assert not api.pending_writes
+
+
+async def test_write_coalescing_failure(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test a failed write fails all writes coalesced into it."""
+    api.write_window = 0.05
+    cloud.fail(500, path="fans/100000")
+
+    results = await asyncio.gather(
+        api.write(100000, {"mode": "always_on"}),
+        api.write(100000, {"speed_level": 5}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, aiohttp.ClientResponseError) for result in results)
+    assert cloud.requests["/api/fans/100000"] == 1
+
+
+@pytest.mark.parametrize("cloud", [(1, 3, 10)], indirect=True)
+async def test_write_batch_rate_limited(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test a batch of writes is not held back by the default rate limit."""
+    api.limiter = RateLimiter()
+    start = time.monotonic()
+
+    await asyncio.gather(
+        *(api.write(fan_id, {"mode": "always_on"}, system_id=1) for fan_id in cloud.fans)
+    )
+
+    assert len(cloud.fans) == 30
+    assert time.monotonic() - start < 5
+    assert api.limiter.waits == 0
@@ -0,0 +1,158 @@
+"""Benchmarks of the SmartCocoon integration against the fake cloud.
+
+Run with pytest-benchmark, e.g. to compare revisions:
+
+    pytest tests/test_benchmark.py --benchmark-autosave --benchmark-compare
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from itertools import cycle
+from unittest.mock import patch
+
+from fake_cloud import FakeCloud
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.fan import DATA_COMPONENT
+from homeassistant.core import HomeAssistant
+
+from custom_components.smartcocoon import async_add_fan_entities
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.api.data import Data as SmartCocoonData
+from custom_components.smartcocoon.const import DATA_COORDINATORS, DOMAIN
+
+from . import setup_integration
+
+LARGE_ACCOUNT = (10, 6, 3)
+
+PLATFORMS = ("binary_sensor", "fan", "number", "select")
+
+
+@pytest.fixture(name="loop")
+def loop_fixture() -> Generator[asyncio.AbstractEventLoop]:
+    """Return a private event loop for benchmarking coroutines."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(name="large_api")
+def large_api_fixture(
+    loop: asyncio.AbstractEventLoop, socket_enabled: None
+) -> Generator[SmartCocoonAPI]:
+    """Return an API client of a fake cloud with a large account."""
+    cloud = FakeCloud.synthetic(*LARGE_ACCOUNT)
+    api = SmartCocoonAPI(
+        authorization="Bearer fake", api_prefix=loop.run_until_complete(cloud.start())
+    )
+    yield api
+    loop.run_until_complete(api.close())
+    loop.run_until_complete(cloud.stop())
+
+
+def test_update_system(
+    benchmark: BenchmarkFixture,
+    loop: asyncio.AbstractEventLoop,
+    large_api: SmartCocoonAPI,
+) -> None:
+    """Benchmark polling one system, as each coordinator does."""
+    large_api.bulk_rooms = False
+    system_ids = cycle(range(1, LARGE_ACCOUNT[0] + 1))
+
+    data = benchmark(
+        lambda: loop.run_until_complete(
+            large_api.update(target_systems=[next(system_ids)])
+        )
+    )
+
+    assert len(data.systems) == 1
+
+
+def test_update_with_siblings(
+    benchmark: BenchmarkFixture,
+    loop: asyncio.AbstractEventLoop,
+    large_api: SmartCocoonAPI,
+) -> None:
+    """Benchmark polling one system with its siblings in a bulk request."""
+    system_ids = range(1, LARGE_ACCOUNT[0] + 1)
+
+    data = benchmark(
+        lambda: loop.run_until_complete(
+            large_api.update(target_systems=[1], sibling_systems=system_ids)
+        )
+    )
+
+    assert len(data.systems) == LARGE_ACCOUNT[0]
+
+
+@pytest.mark.parametrize("cloud", [LARGE_ACCOUNT], indirect=True)
+async def test_platform_setup(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    cloud: FakeCloud,
+    benchmark: BenchmarkFixture,
+) -> None:
+    """Benchmark creating the entities of all fans, as the platforms do."""
+    patchers = [
+        patch(
+            f"custom_components.smartcocoon.{platform}.async_add_fan_entities",
+            wraps=async_add_fan_entities,
+        )
+        for platform in PLATFORMS
+    ]
+    mocks = [patcher.start() for patcher in patchers]
+    try:
+        await setup_integration(hass, config_entry, cloud)
+    finally:
+        for patcher in patchers:
+            patcher.stop()
+    # The entity factories of the platforms, as passed to async_add_fan_entities
+    factories = [mock.call_args.args[3] for mock in mocks]
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS]
+
+    def create_entities() -> list:
+        return [
+            entity
+            for coordinator in coordinators.values()
+            for fan in coordinator.data.fans.values()
+            for create in factories
+            for entity in create(coordinator, fan)
+        ]
+
+    entities = benchmark(create_entities)
+
+    assert len(entities) >= len(cloud.fans) * len(PLATFORMS)
+
+
+@pytest.mark.parametrize("cloud", [LARGE_ACCOUNT], indirect=True)
+async def test_entity_resolution(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    cloud: FakeCloud,
+    benchmark: BenchmarkFixture,
+) -> None:
+    """Benchmark resolving the state of all fan entities after a poll."""
+    coordinators = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS]
+    entities = list(hass.data[DATA_COMPONENT].entities)
+    systems = {
+        system_id: list(coordinator.data)
+        for system_id, coordinator in coordinators.items()
+    }
+
+    def resolve() -> list[tuple]:
+        for system_id, coordinator in coordinators.items():
+            # A poll replaces the data, invalidating the cached fans
+            coordinator.data = SmartCocoonData(systems[system_id])
+        return [
+            (entity.available, entity.is_on, entity.preset_mode, entity.unique_id)
+            for entity in entities
+        ]
+
+    states = benchmark(resolve)
+
+    assert len(states) > len(cloud.fans)
+    assert all(available for available, *_ in states)
@@ -0,0 +1,69 @@
+"""Tests for capturing SmartCocoon API responses."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from pathlib import Path
+
+from fake_cloud import FakeCloud
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.api.capture import Capture
+
+
+def test_rotate_count(tmp_path: Path) -> None:
+    """Test the oldest files beyond the count cap are removed."""
+    capture = Capture(str(tmp_path), max_files=3)
+    for index in range(5):
+        capture.write(1_700_000_000 + index, f"rooms_{index}", {"index": index})
+
+    files = sorted(file.name.split("_")[1] for file in tmp_path.glob("*.json.gz"))
+    assert files == ["2", "3", "4"]
+
+
+def test_rotate_size(tmp_path: Path) -> None:
+    """Test the oldest files beyond the size cap are removed."""
+    capture = Capture(str(tmp_path))
+    capture.write(1_700_000_000, "rooms", {"index": 0})
+    size = next(tmp_path.glob("*.json.gz")).stat().st_size
+    capture.max_bytes = size * 2
+    for index in range(1, 4):
+        capture.write(1_700_000_000 + index, "rooms", {"index": index})
+
+    files = list(tmp_path.glob("*.json.gz"))
+    assert len(files) == 2
+    assert sorted(
+        json.loads(gzip.decompress(file.read_bytes()))["index"] for file in files
+    ) == [2, 3]
+
+
+async def test_queue_full(tmp_path: Path) -> None:
+    """Test results are dropped rather than waited for when the queue is full."""
+    capture = Capture(str(tmp_path), queue_size=1)
+    capture.put("rooms", {})
+    capture.put("rooms", {})
+    await capture.stop()
+
+    assert capture.dropped == 1
+
+
+async def test_capture_responses(cloud: FakeCloud, tmp_path: Path) -> None:
+    """Test responses are captured off the event loop while updating."""
+    api = SmartCocoonAPI(
+        authorization="Bearer fake", api_prefix=cloud.url, save_location=str(tmp_path)
+    )
+    try:
+        data = await api.update()
+        async with asyncio.timeout(5):
+            while len(list(tmp_path.glob("*.json.gz"))) < 2:
+                await asyncio.sleep(0.01)
+    finally:
+        await api.close()
+
+    assert {
+        file.name.removesuffix(".json.gz").rsplit("_", 1)[0]
+        for file in tmp_path.glob("*.json.gz")
+    } == {"client_systems", "rooms"}
+    assert data.fans[100000].data is not None
@@ -0,0 +1,189 @@
+"""Tests for the SmartCocoon coordinator."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from fake_cloud import FakeCloud
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from custom_components.smartcocoon.api.const import RETRY_ATTEMPTS, FanMode
+from custom_components.smartcocoon.const import (
+    DATA_COORDINATORS,
+    DOMAIN,
+    REQUEST_REFRESH_COOLDOWN,
+)
+from custom_components.smartcocoon.coordinator import SmartCocoonCoordinator
+
+
+def get_coordinator(
+    hass: HomeAssistant, config_entry: MockConfigEntry, system_id: int
+) -> SmartCocoonCoordinator:
+    """Return the coordinator of a system."""
+    return hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS][system_id]
+
+
+async def test_write_applies_response(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a fan returned by a write is applied without refreshing."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+
+    with patch.object(coordinator, "async_request_refresh") as refresh:
+        await coordinator.async_set_fan(100000, {"mode": FanMode.ON})
+
+    fan = coordinator.data.fans[100000]
+    assert (fan.mode, fan.fan_on) == (FanMode.ON, True)
+    assert cloud.fans[100000]["mode"] == FanMode.ON
+    refresh.assert_not_called()
+
+
+async def test_write_rollback(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test the optimistic state is rolled back if a write fails."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    cloud.fail(500, path="fans/100000")
+
+    with pytest.raises(HomeAssistantError):
+        await coordinator.async_set_fan(100000, {"mode": FanMode.ON})
+
+    fan = coordinator.data.fans[100000]
+    assert (fan.mode, fan.fan_on) == (FanMode.AUTO, False)
+    assert coordinator.data.changed == {100000}
+
+
+async def test_set_fans(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a batch reports failures per fan and rolls back only those."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    cloud.fail(500, path="fans/100001")
+
+    errors = await coordinator.async_set_fans(
+        [100000, 100001, 100000, 999], {"speed_level": 7}
+    )
+
+    assert list(errors) == [100000, 100001, 999]
+    assert errors[100000] is None
+    assert isinstance(errors[100001], HomeAssistantError)
+    assert isinstance(errors[999], HomeAssistantError)
+    assert coordinator.data.fans[100000].speed_level == 7
+    assert coordinator.data.fans[100001].speed_level == 2
+    assert cloud.requests["/api/fans/100000"] == 1
+
+
+async def test_set_fans_single_refresh(
+    hass: HomeAssistant, setup_integration: MockConfigEntry
+) -> None:
+    """Test a batch without fans in the responses refreshes once."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+
+    with (
+        patch.object(coordinator.api, "write", return_value=None),
+        patch.object(coordinator, "async_request_refresh") as refresh,
+    ):
+        errors = await coordinator.async_set_fans(
+            [100000, 100001, 100100], {"speed_level": 7}
+        )
+
+    assert set(errors.values()) == {None}
+    refresh.assert_called_once()
+
+
+async def test_serve_stale(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test the last good data is served after a transient failure."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    data = coordinator.data
+    cloud.fail(503, count=RETRY_ATTEMPTS, path="rooms")
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data is data
+    assert coordinator.stale_since is not None
+
+    await coordinator.async_refresh()
+
+    assert coordinator.stale_since is None
+
+
+async def test_siblings_share_poll(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a poll also updates the sibling systems with one request."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    sibling = get_coordinator(hass, setup_integration, 2)
+    requests = cloud.requests["/api/rooms"]
+    cloud.fans[200000]["speed_level"] = 9
+
+    await coordinator.async_refresh()
+
+    assert cloud.requests["/api/rooms"] == requests + 1
+    assert coordinator.data.systems.keys() == {1}
+    assert sibling.data.systems.keys() == {2}
+    assert sibling.data.fans[200000].speed_level == 9
+
+
+async def test_relogin(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a rejected authorization logs in again and is persisted."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    coordinator.api.authorization = "Bearer stale"
+    cloud.fail(403, path="rooms")
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert cloud.requests["/api/auth/sign_in"] == 1
+    assert setup_integration.data["authorization"] == "Bearer fake"
+
+
+async def test_patch_invalidates_model(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a patched fan is not served from the cached model of its system."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    api = coordinator.api
+
+    coordinator.async_patch_fan(100000, {"speed_level": 9})
+
+    assert 1 not in api.models
+    assert 2 in api.models
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data.fans[100000].speed_level == cloud.fans[100000]["speed_level"]
+
+
+async def test_command_refresh_debounced(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test commands needing a refresh within the cooldown refresh once."""
+    coordinator = get_coordinator(hass, setup_integration, 1)
+    requests = cloud.requests["/api/rooms"]
+
+    with patch.object(coordinator.api, "write", return_value=None):
+        await coordinator.async_set_fan(100000, {"mode": FanMode.ON})
+        await coordinator.async_set_fan(100001, {"mode": FanMode.ON})
+
+    assert cloud.requests["/api/rooms"] == requests
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=REQUEST_REFRESH_COOLDOWN + 1)
+    )
+    await hass.async_block_till_done()
+
+    assert cloud.requests["/api/rooms"] == requests + 1
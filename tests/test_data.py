@@ -0,0 +1,59 @@
+"""Tests for the SmartCocoon data models."""
+
+from __future__ import annotations
+
+from fake_cloud import FakeCloud
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.api.const import FanMode
+
+
+async def test_diff(cloud: FakeCloud, api: SmartCocoonAPI) -> None:
+    """Test changed and removed fans are detected between updates."""
+    first = await api.update()
+
+    assert first.diff(None) == set(cloud.fans)
+
+    cloud.fans[100000]["speed_level"] = 9
+    cloud.rooms[2][0]["fans"].pop()
+    second = await api.update()
+
+    assert second.diff(first) == {100000, 200001}
+    assert second != first
+
+    third = await api.update()
+
+    assert third.diff(second) == set()
+    assert third == second
+
+
+async def test_patch_fan(api: SmartCocoonAPI) -> None:
+    """Test patching a fan updates its state."""
+    data = await api.update()
+    state = data.states[100000]
+
+    assert data.patch_fan(100000, {"speed_level": 3, "unknown": True})
+    assert data.fans[100000].speed_level == 3
+    assert data.states[100000] != state
+    assert data.changed == {100000}
+
+    assert not data.patch_fan(100000, {"speed_level": 3})
+    assert not data.patch_fan(999, {"speed_level": 3})
+
+
+async def test_optimistic_state(api: SmartCocoonAPI) -> None:
+    """Test the expected state after a write."""
+    fan = (await api.update()).fans[100000]
+
+    assert fan.optimistic_state({"mode": FanMode.ON, "unknown": True}) == {
+        "mode": FanMode.ON,
+        "fan_on": True,
+    }
+    assert fan.optimistic_state({"mode": FanMode.OFF}) == {
+        "mode": FanMode.OFF,
+        "fan_on": False,
+    }
+    assert fan.optimistic_state({"mode": FanMode.AUTO, "speed_level": 4}) == {
+        "mode": FanMode.AUTO,
+        "speed_level": 4,
+    }
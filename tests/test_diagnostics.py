@@ -0,0 +1,43 @@
+"""Tests for the SmartCocoon diagnostics."""
+
+from __future__ import annotations
+
+from fake_cloud import FakeCloud
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+)
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+
+
+async def test_diagnostics(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    setup_integration: MockConfigEntry,
+    cloud: FakeCloud,
+) -> None:
+    """Test diagnostics report the state of the client and are redacted."""
+    diagnostics = await get_diagnostics_for_config_entry(
+        hass, hass_client, setup_integration
+    )
+
+    assert diagnostics["entry"]["data"]["password"] == REDACTED
+    assert diagnostics["entry"]["data"]["authorization"] == REDACTED
+    assert diagnostics["coordinators"].keys() == {"1", "2"}
+    assert diagnostics["coordinators"]["1"]["last_update_success"] is True
+    assert diagnostics["api"]["breaker"]["state"] == "closed"
+    assert diagnostics["api"]["limiter"]["waiting"] == 0
+    assert sum(
+        endpoint["requests"] for endpoint in diagnostics["api"]["stats"].values()
+    ) == sum(cloud.requests.values())
+    fans = [
+        fan
+        for system in diagnostics["data"]
+        for room in system["rooms"]
+        for fan in room["fans"]
+    ]
+    assert len(fans) == len(cloud.fans)
+    assert {fan["mqtt_password"] for fan in fans} == {REDACTED}
@@ -0,0 +1,76 @@
+"""Tests for the SmartCocoon fan platform."""
+
+from __future__ import annotations
+
+from fake_cloud import FakeCloud
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.fan import (
+    ATTR_PRESET_MODE,
+    DOMAIN as FAN_DOMAIN,
+    SERVICE_SET_PRESET_MODE,
+    SERVICE_TURN_ON,
+)
+from homeassistant.const import ATTR_ENTITY_ID, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartcocoon import group_unique_id
+from custom_components.smartcocoon.const import DOMAIN
+
+
+async def test_group_commands(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test group commands are written to all member fans."""
+    entity_registry = er.async_get(hass)
+    room_group = entity_registry.async_get_entity_id(
+        FAN_DOMAIN, DOMAIN, group_unique_id(setup_integration, 1, 1000)
+    )
+    system_group = entity_registry.async_get_entity_id(
+        FAN_DOMAIN, DOMAIN, group_unique_id(setup_integration, 1)
+    )
+
+    await hass.services.async_call(
+        FAN_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: room_group}, blocking=True
+    )
+
+    assert [cloud.fans[fan_id]["mode"] for fan_id in (100000, 100001, 100100)] == [
+        "always_on",
+        "always_on",
+        "auto",
+    ]
+    assert hass.states.get(room_group).state == STATE_ON
+
+    await hass.services.async_call(
+        FAN_DOMAIN,
+        SERVICE_SET_PRESET_MODE,
+        {ATTR_ENTITY_ID: system_group, ATTR_PRESET_MODE: "eco"},
+        blocking=True,
+    )
+
+    assert {cloud.fans[fan_id]["mode"] for fan_id in cloud.fans if fan_id < 200000} == {
+        "eco"
+    }
+    assert hass.states.get(system_group).attributes[ATTR_PRESET_MODE] == "eco"
+    assert cloud.fans[200000]["mode"] == "auto"
+
+
+async def test_group_command_failure(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a failing member is reported after the others are written."""
+    room_group = er.async_get(hass).async_get_entity_id(
+        FAN_DOMAIN, DOMAIN, group_unique_id(setup_integration, 1, 1000)
+    )
+    cloud.fail(500, path="fans/100001")
+
+    with pytest.raises(HomeAssistantError, match="Failed to write 1 of 2 fans: Fan"):
+        await hass.services.async_call(
+            FAN_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: room_group}, blocking=True
+        )
+
+    assert cloud.fans[100000]["mode"] == "always_on"
+    assert cloud.fans[100001]["mode"] == "auto"
@@ -0,0 +1,310 @@
+"""Tests for setting up the SmartCocoon integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+from fake_cloud import FakeCloud
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.const import (
+    CONF_AUTO_INCLUDE_FANS,
+    CONF_FANS,
+    DATA_COORDINATORS,
+    DOMAIN,
+    FAN_REMOVAL_POLLS,
+    POLL_STAGGER_STEP,
+    SERVICE_SET_FANS,
+    STORAGE_VERSION,
+)
+
+from . import setup_integration
+
+
+async def test_setup(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test entities are created for all fans, rooms and systems."""
+    entity_registry = er.async_get(hass)
+
+    assert setup_integration.state is ConfigEntryState.LOADED
+    for fan in cloud.fans.values():
+        entity_id = entity_registry.async_get_entity_id("fan", DOMAIN, fan["fan_id"])
+        assert hass.states.get(entity_id) is not None
+    groups = [
+        entry
+        for entry in er.async_entries_for_config_entry(
+            entity_registry, setup_integration.entry_id
+        )
+        if entry.domain == "fan"
+        and entry.unique_id.startswith(setup_integration.entry_id)
+    ]
+    assert len(groups) == len(cloud.systems) + sum(map(len, cloud.rooms.values()))
+
+    assert await hass.config_entries.async_unload(setup_integration.entry_id)
+    assert setup_integration.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_set_fans(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test the set fans action writes fans of several systems."""
+    entity_registry = er.async_get(hass)
+    entity_ids = [
+        entity_registry.async_get_entity_id("fan", DOMAIN, cloud.fans[fan_id]["fan_id"])
+        for fan_id in (100000, 200000)
+    ]
+    cloud.fail(500, path="fans/200000")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_FANS,
+        {ATTR_ENTITY_ID: entity_ids, "speed_level": 4},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["fans"]["100000"] == {"success": True, "name": "Fan 100000"}
+    assert response["fans"]["200000"]["success"] is False
+    assert cloud.fans[100000]["speed_level"] == 4
+
+    with pytest.raises(HomeAssistantError, match="Failed to write 1 of 1 fans"):
+        cloud.fail(500, path="fans/200000")
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_FANS,
+            {ATTR_ENTITY_ID: entity_ids[1], "mode": "eco"},
+            blocking=True,
+        )
+
+
+async def test_removed_fan(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test fans are removed once missing from several polls, with their room."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    coordinator = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS][1]
+    room = cloud.rooms[1].pop()
+    room_group = f"{setup_integration.entry_id}-system-1-room-{room['id']}"
+
+    for _ in range(FAN_REMOVAL_POLLS - 1):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert device_registry.async_get_device(identifiers={(DOMAIN, "100100")})
+        assert entity_registry.async_get_entity_id("fan", DOMAIN, room_group)
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert not device_registry.async_get_device(identifiers={(DOMAIN, "100100")})
+    assert not device_registry.async_get_device(identifiers={(DOMAIN, "100101")})
+    assert not entity_registry.async_get_entity_id("fan", DOMAIN, room_group)
+    assert device_registry.async_get_device(identifiers={(DOMAIN, "100000")})
+
+
+async def test_empty_response_keeps_fans(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test a response without any fans removes nothing."""
+    device_registry = dr.async_get(hass)
+    coordinator = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS][1]
+    rooms = cloud.rooms[1][:]
+    cloud.rooms[1].clear()
+
+    for _ in range(FAN_REMOVAL_POLLS):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert coordinator.missing_fans == {}
+    assert device_registry.async_get_device(identifiers={(DOMAIN, "100000")})
+
+    cloud.rooms[1][:] = rooms
+
+
+async def test_returning_fan(
+    hass: HomeAssistant,
+    setup_integration: MockConfigEntry,
+    cloud: FakeCloud,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test a fan returning before its removal keeps its entities."""
+    entity_registry = er.async_get(hass)
+    coordinator = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS][1]
+    entity_id = entity_registry.async_get_entity_id("select", DOMAIN, "SC00100100-mode")
+    room = cloud.rooms[1].pop()
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == "unavailable"
+
+    cloud.rooms[1].append(room)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == "auto"
+    assert coordinator.missing_fans == {}
+    assert "does not generate unique IDs" not in caplog.text
+
+
+async def test_setup_from_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    config_entry: MockConfigEntry,
+    cloud: FakeCloud,
+    api: SmartCocoonAPI,
+) -> None:
+    """Test setup starts from the snapshot and every coordinator polls later."""
+    hass_storage[f"{DOMAIN}.{config_entry.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{config_entry.entry_id}",
+        "data": {"systems": (await api.update()).as_list()},
+    }
+    cloud.requests.clear()
+    cloud.fans[100000]["mode"] = "eco"
+
+    await setup_integration(hass, config_entry, cloud)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS]
+
+    # The coordinator without a phase refreshed in the background
+    assert cloud.requests["/api/rooms"] == 1
+    assert coordinators[1].data.fans[100000].mode == "eco"
+    for coordinator in coordinators.values():
+        assert coordinator.update_interval > timedelta(0)
+        assert coordinator._unsub_refresh is not None
+
+
+async def test_options_fan_selection(
+    hass: HomeAssistant, setup_integration: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test changed fan selections add and remove entities without a reload."""
+    entity_registry = er.async_get(hass)
+    coordinators = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS]
+    fan_ids = {fan_id: fan["fan_id"] for fan_id, fan in cloud.fans.items()}
+
+    def selected() -> set[int]:
+        return {
+            fan_id
+            for fan_id, unique_id in fan_ids.items()
+            if entity_registry.async_get_entity_id("fan", DOMAIN, unique_id)
+        }
+
+    hass.config_entries.async_update_entry(
+        setup_integration,
+        options={CONF_AUTO_INCLUDE_FANS: False, CONF_FANS: [100001, 200000]},
+    )
+    await hass.async_block_till_done()
+
+    assert selected() == {100001, 200000}
+    for _ in range(FAN_REMOVAL_POLLS):
+        await coordinators[1].async_refresh()
+    assert coordinators[1].missing_fans == {}
+
+    hass.config_entries.async_update_entry(
+        setup_integration,
+        options={CONF_AUTO_INCLUDE_FANS: False, CONF_FANS: [100000, 100001, 200000]},
+    )
+    await hass.async_block_till_done()
+
+    assert selected() == {100000, 100001, 200000}
+    entity_id = entity_registry.async_get_entity_id("fan", DOMAIN, fan_ids[100000])
+    assert hass.states.get(entity_id).state == "off"
+
+    hass.config_entries.async_update_entry(
+        setup_integration, options={CONF_AUTO_INCLUDE_FANS: True, CONF_FANS: []}
+    )
+    await hass.async_block_till_done()
+
+    assert selected() == fan_ids.keys()
+    assert setup_integration.state is ConfigEntryState.LOADED
+
+
+async def test_deselected_system_groups(
+    hass: HomeAssistant, setup_integration: MockConfigEntry
+) -> None:
+    """Test groups are removed once all fans of their room or system are deselected."""
+    entity_registry = er.async_get(hass)
+    entry_id = setup_integration.entry_id
+
+    def groups() -> set[str]:
+        return {
+            entry.unique_id.removeprefix(f"{entry_id}-")
+            for entry in er.async_entries_for_config_entry(entity_registry, entry_id)
+            if entry.domain == "fan" and entry.unique_id.startswith(entry_id)
+        }
+
+    hass.config_entries.async_update_entry(
+        setup_integration,
+        options={CONF_AUTO_INCLUDE_FANS: False, CONF_FANS: [100000, 100001]},
+    )
+    await hass.async_block_till_done()
+
+    assert groups() == {"system-1", "system-1-room-1000"}
+
+    hass.config_entries.async_update_entry(
+        setup_integration,
+        options={CONF_AUTO_INCLUDE_FANS: False, CONF_FANS: [100000, 200100]},
+    )
+    await hass.async_block_till_done()
+
+    assert groups() == {
+        "system-1",
+        "system-1-room-1000",
+        "system-2",
+        "system-2-room-2001",
+    }
+
+
+async def test_remove_entry_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    setup_integration: MockConfigEntry,
+    cloud: FakeCloud,
+) -> None:
+    """Test a pending snapshot save does not outlive the removed entry."""
+    key = f"{DOMAIN}.{setup_integration.entry_id}"
+    coordinator = hass.data[DOMAIN][setup_integration.entry_id][DATA_COORDINATORS][1]
+    cloud.fans[100000]["mode"] = "eco"
+    await coordinator.async_refresh()
+
+    assert await hass.config_entries.async_unload(setup_integration.entry_id)
+    assert hass_storage[key]["data"]["systems"]
+
+    await hass.config_entries.async_remove(setup_integration.entry_id)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=5))
+    await hass.async_block_till_done()
+
+    assert key not in hass_storage
+
+
+async def test_polls_staggered(
+    hass: HomeAssistant, config_entry: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test the first polls of the coordinators are staggered."""
+    with patch(
+        "custom_components.smartcocoon.coordinator.random.uniform", return_value=1
+    ):
+        await setup_integration(hass, config_entry, cloud)
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS]
+
+    assert coordinators[2].update_interval - coordinators[1].update_interval == (
+        timedelta(seconds=POLL_STAGGER_STEP)
+    )
+    assert coordinators[1].phase == coordinators[2].phase == 0
@@ -0,0 +1,108 @@
+"""Tests for the SmartCocoon rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.smartcocoon.api.limiter import RateLimiter
+
+
+async def test_burst() -> None:
+    """Test requests wait for the bucket to refill once the burst is spent."""
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert time.monotonic() - start >= 0.015
+    assert limiter.waits == 1
+    assert limiter.as_dict()["waiting"] == 0
+
+
+async def test_priority() -> None:
+    """Test waiting priority requests are granted tokens first."""
+    limiter = RateLimiter(rate=50, burst=1, command_burst=0)
+    await limiter.acquire()
+    order: list[str] = []
+
+    async def acquire(name: str, priority: bool) -> None:
+        await limiter.acquire(priority=priority)
+        order.append(name)
+
+    await asyncio.gather(
+        acquire("poll", False), acquire("command", True), acquire("write", True)
+    )
+
+    assert order == ["command", "write", "poll"]
+
+
+async def test_command_budget() -> None:
+    """Test commands spend their own bucket before waiting for shared tokens."""
+    limiter = RateLimiter(rate=1, burst=1, command_rate=1, command_burst=30)
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire(priority=True) for _ in range(31)))
+
+    assert time.monotonic() - start < 0.5
+    assert limiter.waits == 0
+    assert limiter.command_tokens < 1
+    assert limiter.tokens < 1
+
+
+async def test_throttle_commands() -> None:
+    """Test throttling empties the command bucket too."""
+    limiter = RateLimiter(rate=1000, burst=10, command_rate=1000)
+    limiter.throttle(0.05)
+    start = time.monotonic()
+    await limiter.acquire(priority=True)
+
+    assert time.monotonic() - start >= 0.05
+
+
+async def test_cancel_waiting() -> None:
+    """Test a cancelled waiter leaves the queue."""
+    limiter = RateLimiter(rate=1, burst=1)
+    await limiter.acquire()
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert limiter.as_dict()["waiting"] == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.as_dict()["waiting"] == 0
+    limiter.handle.cancel()
+
+
+async def test_cancel_granted() -> None:
+    """Test a waiter cancelled after being granted a token returns it."""
+    limiter = RateLimiter(rate=1, burst=1)
+    await limiter.acquire()
+    task = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.handle.cancel()
+    limiter.tokens = 1
+    limiter.release()
+
+    assert limiter.tokens < 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.tokens == pytest.approx(1, abs=0.01)
+
+
+async def test_throttle() -> None:
+    """Test throttling empties the bucket and pauses refilling."""
+    limiter = RateLimiter(rate=1000, burst=10)
+    limiter.throttle(0.05)
+    start = time.monotonic()
+    await limiter.acquire()
+
+    assert time.monotonic() - start >= 0.05
+    assert limiter.as_dict()["waits"] == 1
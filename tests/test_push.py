@@ -0,0 +1,135 @@
+"""Tests for the SmartCocoon push transport against the fake broker."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from unittest.mock import patch
+
+from fake_broker import FakeBroker
+from fake_cloud import FakeCloud
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.smartcocoon.api import SmartCocoonAPI
+from custom_components.smartcocoon.api.const import MQTT_STATE_TOPIC
+from custom_components.smartcocoon.api.push import Push
+from custom_components.smartcocoon.const import (
+    CONF_MQTT_HOST,
+    CONF_MQTT_PORT,
+    DATA_COORDINATORS,
+    DATA_PUSH,
+    DOMAIN,
+    ScanInterval,
+)
+
+from . import setup_integration
+
+
+@pytest.fixture
+async def broker(cloud: FakeCloud) -> AsyncGenerator[FakeBroker]:
+    """Serve the fans of the fake cloud, accepting their credentials."""
+    broker = FakeBroker(
+        {fan["mqtt_username"]: fan["mqtt_password"] for fan in cloud.fans.values()}
+    )
+    await broker.start()
+    yield broker
+    await broker.stop()
+
+
+def state_topic(cloud: FakeCloud, fan_id: int) -> str:
+    """Return the state topic of a fan."""
+    fan = cloud.fans[fan_id]
+    return MQTT_STATE_TOPIC.format(
+        mqtt_username=fan["mqtt_username"], fan_id=fan["fan_id"]
+    )
+
+
+async def test_push(cloud: FakeCloud, api: SmartCocoonAPI, broker: FakeBroker) -> None:
+    """Test fan states are pushed and subscriptions follow the fans."""
+    received: asyncio.Queue[tuple[int, dict]] = asyncio.Queue()
+    push = Push(
+        host="127.0.0.1",
+        port=broker.port,
+        callback=lambda fan_id, data: received.put_nowait((fan_id, data)),
+    )
+    data = await api.update()
+    try:
+        push.update_fans(data.fans.values())
+        async with asyncio.timeout(5):
+            await broker.wait_subscribed(state_topic(cloud, 100000))
+
+            assert broker.publish(state_topic(cloud, 100000), b"invalid") == 1
+            assert broker.publish(state_topic(cloud, 100000), b'{"speed_level": 9}')
+            assert await received.get() == (100000, {"speed_level": 9})
+
+        fans = [fan for fan in data.fans.values() if fan.system.id == 2]
+        push.update_fans(fans)
+
+        assert set(push.tasks) == {fan.id for fan in fans}
+    finally:
+        await push.stop()
+
+    assert received.empty()
+    assert broker.connections == len(cloud.fans)
+    assert broker.rejected == 0
+
+
+async def test_push_setup(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    cloud: FakeCloud,
+    broker: FakeBroker,
+) -> None:
+    """Test pushed states update the entities of a config entry, not their identity."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_MQTT_HOST: "127.0.0.1", CONF_MQTT_PORT: broker.port},
+    )
+    await setup_integration(hass, config_entry, cloud)
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "number", DOMAIN, "SC00100000-speed_level"
+    )
+    push = hass.data[DOMAIN][config_entry.entry_id][DATA_PUSH]
+
+    assert set(push.tasks) == set(cloud.fans)
+    assert set(push.tasks.values()) <= config_entry._background_tasks
+
+    async with asyncio.timeout(5):
+        await broker.wait_subscribed(state_topic(cloud, 100000))
+        broker.publish(
+            state_topic(cloud, 100000),
+            b'{"id": 1, "fan_id": "SC1", "room_id": 1, "speed_level": 11}',
+        )
+        while hass.states.get(entity_id).state != "11":
+            await asyncio.sleep(0.01)
+
+    fan = hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS][1].data.fans[
+        100000
+    ]
+    assert (fan.id, fan.fan_id, fan.room_id) == (100000, "SC00100000", 1000)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert all(task.done() for task in push.tasks.values())
+
+
+async def test_push_unavailable(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    cloud: FakeCloud,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the entry polls as usual if aiomqtt is not installed."""
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_MQTT_HOST: "127.0.0.1"}
+    )
+    with patch("custom_components.smartcocoon.aiomqtt", None):
+        await setup_integration(hass, config_entry, cloud)
+
+    entry = hass.data[DOMAIN][config_entry.entry_id]
+    assert entry[DATA_PUSH] is None
+    assert entry[DATA_COORDINATORS][1].scan_interval == ScanInterval.DEFAULT
+    assert "Push updates require aiomqtt" in caplog.text
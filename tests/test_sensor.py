@@ -0,0 +1,49 @@
+"""Tests for the SmartCocoon diagnostic sensors."""
+
+from __future__ import annotations
+
+from fake_cloud import FakeCloud
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_component import async_update_entity
+
+from custom_components.smartcocoon.const import DATA_COORDINATORS, DOMAIN
+from custom_components.smartcocoon.sensor import SENSOR_DESCRIPTIONS
+
+from . import setup_integration
+
+
+async def test_sensors(
+    hass: HomeAssistant, config_entry: MockConfigEntry, cloud: FakeCloud
+) -> None:
+    """Test the sensors report request statistics of all systems."""
+    entity_registry = er.async_get(hass)
+    entity_ids = {
+        description.key: entity_registry.async_get_or_create(
+            "sensor",
+            DOMAIN,
+            f"{config_entry.entry_id}-{description.key}",
+            config_entry=config_entry,
+        ).entity_id
+        for description in SENSOR_DESCRIPTIONS
+    }
+    await setup_integration(hass, config_entry, cloud)
+
+    def state(key: str) -> str:
+        return hass.states.get(entity_ids[key]).state
+
+    assert int(state("requests")) == sum(cloud.requests.values())
+    assert int(state("bytes")) > 0
+    assert float(state("update_duration")) >= 0
+    assert state("last_update_success") != "unknown"
+
+    cloud.fail(404, path="rooms")
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATORS][1]
+    await coordinator.async_refresh()
+    for entity_id in entity_ids.values():
+        await async_update_entity(hass, entity_id)
+
+    assert int(state("requests")) == sum(cloud.requests.values())
+    assert state("errors") == "1"